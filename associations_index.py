@@ -0,0 +1,113 @@
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+def normalize_name(name: str) -> str:
+    # Регистр и лишние пробелы не важны: "elia  s" == "Elia S"
+    return " ".join(name.split()).casefold()
+
+def name_variants(name: str) -> List[str]:
+    """Ключи для нестрогого поиска: "Elia Svensson" находится и как "Elia S" с сайта"""
+    parts = normalize_name(name).split(" ")
+    if len(parts) < 2 or not parts[0]:
+        return []
+    short = f"{parts[0]} {parts[-1][0]}"
+    return [short] if short != " ".join(parts) else []
+
+class AssociationIndex:
+    """username ↔ имя с сайта: поиск за O(1) вместо перебора associations.json.
+    Ключ → список владельцев, поэтому /iam и /forgetme меняют только свои ключи"""
+
+    def __init__(self, associations: Optional[Dict[str, str]] = None) -> None:
+        self.lock = threading.Lock()
+        self.names: Dict[str, str] = {}
+        self._exact: Dict[str, List[str]] = {}
+        self._normalized: Dict[str, List[str]] = {}
+        self._variants: Dict[str, List[str]] = {}
+        self._mentions: Dict[str, str] = {}
+        for username, name in (associations or {}).items():
+            self.names[username] = name
+            self._add(username, name)
+
+    def _keys(self, name: str) -> Iterator[Tuple[Dict[str, List[str]], str]]:
+        yield self._exact, name
+        yield self._normalized, normalize_name(name)
+        for key in name_variants(name):
+            yield self._variants, key
+
+    def _add(self, username: str, name: str) -> None:
+        for table, key in self._keys(name):
+            table.setdefault(key, []).append(username)
+
+    def _discard(self, username: str, name: str) -> None:
+        for table, key in self._keys(name):
+            owners = table.get(key, [])
+            if username in owners:
+                owners.remove(username)
+            if not owners:
+                table.pop(key, None)
+
+    def set(self, username: str, name: str) -> None:
+        with self.lock:
+            if username in self.names:
+                self._discard(username, self.names[username])
+            self.names[username] = name
+            self._add(username, name)
+            self._mentions = {}
+
+    def remove(self, username: str) -> None:
+        with self.lock:
+            name = self.names.pop(username, None)
+            if name is not None:
+                self._discard(username, name)
+                self._mentions = {}
+
+    def lookup(self, name: str) -> Optional[str]:
+        key = normalize_name(name)
+        owners = self._exact.get(name) or self._normalized.get(key)
+        if owners:
+            return owners[0]
+        # С сайта приходит "Имя Ф" — ищем среди сокращений полных имён;
+        # одно сокращение у двух людей — неоднозначно, такой ключ не используем
+        owners = self._variants.get(key)
+        if owners and len(owners) == 1:
+            return owners[0]
+        # Полное имя с сайта совпадает с коротким зарегистрированным ("Elia S"), но не с чужим
+        # полным: "Elia Sandberg" и "Elia Svensson" дают одно сокращение, а это разные люди
+        for variant in name_variants(name):
+            owners = self._normalized.get(variant)
+            if owners:
+                return owners[0]
+        return None
+
+    def mention(self, name: str) -> str:
+        cached = self._mentions.get(name)
+        if cached is not None:
+            return cached
+        username = self.lookup(name)
+        if username:
+            result = f"@{username}"
+        else:
+            result = "❓" if name.strip().startswith("Ingen") else name
+        self._mentions[name] = result
+        return result
+
+    def as_dict(self) -> Dict[str, str]:
+        with self.lock:
+            return dict(self.names)
+
+    @classmethod
+    def coerce(cls, name_map: Union["AssociationIndex", Dict[str, str]]) -> "AssociationIndex":
+        return name_map if isinstance(name_map, cls) else cls(name_map)
+
+
+_index: Optional[AssociationIndex] = None
+_index_lock = threading.Lock()
+
+def get_association_index() -> AssociationIndex:
+    """Индекс грузится из хранилища один раз и дальше обновляется командами /iam и /forgetme"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from state_store import get_state_store
+            _index = AssociationIndex(get_state_store().load_associations())
+        return _index
@@ -0,0 +1,167 @@
+import random
+import hashlib
+import time
+import threading
+from datetime import date, timedelta
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+# Те же игры и сотрудники, что встречаются в настоящей таблице
+ROOMS = {"SHE": "Sherlock", "FRO": "Frozen", "BNK": "Bank", "APO": "Apocalypse"}
+STAFF = ["Regina S", "Elia S", "Johan K", "Anna L", "Mikael B", "Sara N", "Oskar P", "Linnea H"]
+SLOTS = ["10:00", "11:30", "13:00", "14:30", "16:00", "17:00", "18:30", "20:00"]
+SESSION_COOKIE = "quezzle_session=bench"
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html lang="sv">
+<head><meta charset="utf-8"><title>Logga in</title></head>
+<body>
+  <form method="post" action="/login">
+    <input type="hidden" name="_token" value="bench-csrf">
+    <input type="email" name="email">
+    <input type="password" name="password">
+    <button type="submit">Logga in</button>
+  </form>
+</body>
+</html>
+"""
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="sv">
+<head>
+  <meta charset="utf-8">
+  <title>Bokningar</title>
+</head>
+<body>
+  <nav class="navbar">
+    <img class="avatar-img rounded-circle" src="/img/avatar.png" alt="">
+  </nav>
+  <div class="container">
+    <div class="card">
+      <div class="table-responsive">
+        <table class="table table-hover">
+          <thead>
+            <tr>
+              <th>Bokning</th><th>Datum</th><th>Tid</th><th>Ansvarig</th><th>Rum</th>
+              <th>Spelare</th><th>Kund</th><th>Telefon</th><th>Status</th><th>Åtgärd</th>
+            </tr>
+          </thead>
+          <tbody>
+"""
+
+PAGE_TAIL = """          </tbody>
+        </table>
+      </div>
+    </div>
+  </div>
+</body>
+</html>
+"""
+
+# ─── Генерация таблицы ────────────────────────────────────────────────────────
+def booking_row(number: int, abbr: str, day: str, slot: str, responsible: str) -> str:
+    return (
+        "            <tr>\n"
+        f'              <td><a href="/booking/{number}">{abbr}{number}</a></td>\n'
+        f"              <td>{day} {slot}</td>\n"
+        f"              <td>{slot}</td>\n"
+        f'              <td><span class="staff">{escape(responsible)}</span></td>\n'
+        f"              <td>{ROOMS[abbr]}</td>\n"
+        f"              <td>{2 + number % 5}</td>\n"
+        f"              <td>Kund {number}</td>\n"
+        "              <td>070-000 00 00</td>\n"
+        '              <td><span class="badge bg-success">Bekräftad</span></td>\n'
+        '              <td><button class="btn btn-sm btn-outline-primary">Visa</button></td>\n'
+        "            </tr>\n"
+    )
+
+def booking_page(rows: int, start: Optional[date] = None, days: int = 14, seed: int = 0) -> str:
+    """Страница бронирований на rows строк, разложенных по days дням начиная со start"""
+    start = start or date.today()
+    rng = random.Random(seed)
+    parts: List[str] = [PAGE_HEAD]
+    for i in range(rows):
+        day = (start + timedelta(days=i % days)).isoformat()
+        parts.append(booking_row(
+            36000 + i,
+            rng.choice(list(ROOMS)),
+            day,
+            SLOTS[(i // days) % len(SLOTS)],
+            rng.choice(STAFF),
+        ))
+    parts.append(PAGE_TAIL)
+    return "".join(parts)
+
+# ─── HTTP-сервер ──────────────────────────────────────────────────────────────
+class BenchServer(ThreadingHTTPServer):
+    # Рассылка открывает много соединений сразу — стандартной очереди в 5 не хватает
+    request_queue_size = 128
+    daemon_threads = True
+
+class FakeQuezzle:
+    """Локальная замена сайта бронирований: форма входа, cookie-сессия и таблица"""
+
+    def __init__(self, rows: int = 100, start: Optional[date] = None, days: int = 14, latency: float = 0.0) -> None:
+        # Задержка ответа на страницу таблицы — медленная площадка
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.logins = 0
+        self.requests = 0
+        self.set_table(rows, start, days)
+        self.server = BenchServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def set_table(self, rows: int, start: Optional[date] = None, days: int = 14, seed: int = 0) -> None:
+        page = booking_page(rows, start, days, seed).encode()
+        with self.lock:
+            self.page = page
+            self.etag = '"' + hashlib.sha1(page).hexdigest()[:16] + '"'
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with site.lock:
+                    site.requests += 1
+                    page, etag = site.page, site.etag
+                if site.latency:
+                    time.sleep(site.latency)
+                if SESSION_COOKIE not in self.headers.get("Cookie", ""):
+                    self._reply(200, LOGIN_PAGE.encode())
+                elif self.headers.get("If-None-Match") == etag:
+                    self._reply(304, b"", {"ETag": etag})
+                else:
+                    self._reply(200, page, {"ETag": etag})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                with site.lock:
+                    site.logins += 1
+                self._reply(200, b"ok", {"Set-Cookie": f"{SESSION_COOKIE}; Path=/"})
+
+            def _reply(self, status, body, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeQuezzle":
+        threading.Thread(target=self.server.serve_forever, name="fake-quezzle", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,100 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler
+from typing import Dict, List
+from urllib.parse import parse_qs
+from fake_quezzle import BenchServer
+
+# ─── Фейковый Bot API ─────────────────────────────────────────────────────────
+class FakeTelegram:
+    """Отвечает на /bot<token>/<method> как Bot API и запоминает отправленное"""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls: List[Dict] = []
+        self.updates: List[Dict] = []
+        self.message_id = 0
+        self.delivered = threading.Condition(self.lock)
+        self.server = BenchServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def queue_update(self, update: Dict) -> None:
+        with self.lock:
+            self.updates.append(update)
+
+    def wait_for(self, count: int, timeout: float = 30) -> bool:
+        """Ждёт, пока бот сделает count вызовов sendMessage/editMessageText"""
+        with self.delivered:
+            return self.delivered.wait_for(lambda: self.sent() >= count, timeout)
+
+    def sent(self) -> int:
+        return sum(1 for call in self.calls if call["method"] != "getUpdates")
+
+    def reset(self) -> None:
+        with self.lock:
+            self.calls.clear()
+            self.updates.clear()
+
+    def _answer(self, method: str, params: Dict[str, str]) -> Dict:
+        with self.delivered:
+            self.calls.append({"method": method, "params": params})
+            if method == "getUpdates":
+                offset = int(params.get("offset") or 0)
+                result = [u for u in self.updates if u["update_id"] >= offset]
+                return {"ok": True, "result": result}
+            self.message_id += 1
+            self.delivered.notify_all()
+            return {"ok": True, "result": {"message_id": self.message_id, "chat": {"id": params.get("chat_id")}}}
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self, query: str):
+                method = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+                params = {k: v[0] for k, v in parse_qs(query).items()}
+                if api.latency:
+                    time.sleep(api.latency)
+                body = json.dumps(api._answer(method, params)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._handle(self.path.split("?", 1)[1] if "?" in self.path else "")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self._handle(self.rfile.read(length).decode())
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeTelegram":
+        threading.Thread(target=self.server.serve_forever, name="fake-telegram", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+def command_update(update_id: int, text: str, chat_id: int = 409897409, username: str = "elia_s") -> Dict:
+    # Та же форма, что в fixtures/updates/*.json
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Bench", "username": username},
+            "chat": {"id": chat_id, "type": "private"},
+            "date": int(time.time()),
+            "text": text,
+        },
+    }
@@ -0,0 +1,239 @@
+"""Офлайн-бенчмарки бота: фейковый сайт бронирований и фейковый Bot API на localhost.
+
+    python benchmarks/run_benchmarks.py                          # 10, 100, 1000, 10000 строк
+    python benchmarks/run_benchmarks.py --sizes 10 1000 --output benchmarks/results/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/baseline.json
+
+Настоящие логин, токен и git не нужны; состояние в репозитории только читается.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_quezzle import FakeQuezzle, STAFF
+from fake_telegram import FakeTelegram, command_update
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results", "latest.json")
+# Во сколько раз медленнее базовой линии считается регрессией
+DEFAULT_THRESHOLD = 1.25
+# Разница меньше этой — шум таймера, а не регрессия
+MIN_DELTA_MS = 0.05
+
+# ─── Измерение ────────────────────────────────────────────────────────────────
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+    }
+
+def repeats_for(size: int) -> int:
+    # Большие таблицы гоняем реже, чтобы весь прогон укладывался в минуту-другую
+    return max(5, min(200, 20000 // max(size, 1)))
+
+# ─── Окружение ────────────────────────────────────────────────────────────────
+def configure_env(quezzle: FakeQuezzle, telegram: FakeTelegram) -> None:
+    """До импорта модулей бота: все внешние адреса — на фейковые серверы"""
+    os.environ.update({
+        "BRAIN_QUEZZLE_LINK": quezzle.url,
+        "BRAIN_QUEZZLE_USERNAME": "bench@example.com",
+        "BRAIN_QUEZZLE_PASSWORD": "bench",
+        "QUEZZLE_FETCHER": "http",
+        "TELEGRAM_TOKEN": "bench-token",
+        "TELEGRAM_API_URL": telegram.url,
+        "TELEGRAM_GLOBAL_RATE": "1000000",
+        "TELEGRAM_PER_CHAT_RATE": "1000000",
+        "GIT_SYNC": "0",
+        "METRICS_PORT": "0",
+    })
+
+def changed_copy(games: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Предыдущее состояние: одна игра отменена, одна перенесена, у одной другой ответственный"""
+    previous = [dict(g) for g in games]
+    if len(previous) > 2:
+        previous[0]["time"] = "09:00"
+        previous[1]["responsible"] = "Someone E"
+        previous.append({"game": "APO99999", "time": "23:00", "responsible": "Regina S"})
+    return previous
+
+# ─── Бенчмарки ────────────────────────────────────────────────────────────────
+# Задержки площадок в многоплощадочном прогоне (секунды): цикл должен занимать ~max, а не сумму
+VENUE_LATENCIES = [0.05, 0.05, 0.2]
+
+def run_venues(results: Dict[str, Dict]) -> None:
+    """Проверка нескольких площадок в общем пуле против одной самой медленной"""
+    from venues import Venue, run_all
+    sites = [FakeQuezzle(100, latency=latency).start() for latency in VENUE_LATENCIES]
+    try:
+        venues = [Venue(f"bench-{i}", site.url, "bench@example.com", "bench") for i, site in enumerate(sites)]
+        for venue in venues:
+            venue.tagged = True
+        refresh = lambda venue: venue.cache().refresh()
+        results[f"venue_cycle[{len(venues)} venues]"] = measure(lambda: run_all(refresh, venues), 10)
+        results["venue_cycle[slowest only]"] = measure(lambda: run_all(refresh, venues[-1:]), 10)
+    finally:
+        for site in sites:
+            site.stop()
+
+def run(sizes: List[int], chats: List[int]) -> Dict[str, Dict]:
+    quezzle = FakeQuezzle().start()
+    telegram = FakeTelegram().start()
+    configure_env(quezzle, telegram)
+
+    import metrics
+    from quezzle_fetchers import HttpFetcher, parse_booking_table, table_fragment
+    from quezzle_schedule import get_games_by_date, generate_message, format_mention
+    from schedule_snapshot import ScheduleSnapshot
+    from schedule_cache import get_schedule_cache
+    from associations_index import AssociationIndex
+    from telegram_broadcast import Broadcaster
+    from telegram_commands_handler import parse_command, handle_command
+
+    today = datetime.now(ZoneInfo("Europe/Stockholm")).date()
+    today_str = today.isoformat()
+    associations = {f"user_{i}": name for i, name in enumerate(STAFF)}
+    results: Dict[str, Dict] = {}
+
+    try:
+        for size in sizes:
+            quezzle.set_table(size, today)
+            repeat = repeats_for(size)
+            print(f"▶ {size} строк ({repeat} повторов)")
+
+            fetcher = HttpFetcher()
+            results[f"fetch_table[{size}]"] = measure(lambda: fetcher.fetch_table(), repeat)
+            results[f"fetch_table_unchanged[{size}]"] = measure(
+                lambda: fetcher.fetch_table(fetcher.validators.get("digest")), repeat)
+
+            html = quezzle.page.decode()
+            results[f"parse_table[{size}]"] = measure(lambda: parse_booking_table(table_fragment(html)), repeat)
+            rows = parse_booking_table(table_fragment(html))
+
+            results[f"get_games_by_date[{size}]"] = measure(lambda: get_games_by_date(rows, today_str), repeat)
+            snapshot = ScheduleSnapshot.from_rows(rows)
+            results[f"snapshot_games_for[{size}]"] = measure(lambda: snapshot.games_for(today_str), repeat * 10)
+
+            current = snapshot.games_for(today_str)
+            previous = changed_copy(current)
+            name_map = AssociationIndex(associations)
+            results[f"generate_message[{size}]"] = measure(
+                lambda: generate_message(today_str, current, previous, name_map, True), repeat)
+
+            names = [b.responsible for b in snapshot.bookings]
+            results[f"format_mention[{size}]"] = measure(
+                lambda: [format_mention(name, name_map) for name in names], repeat)
+
+            # Полный круг: апдейт → разбор → скрейп фейкового сайта → ответ в фейковый Bot API
+            update = command_update(size, "/today")
+            cache = get_schedule_cache()
+
+            def round_trip(cold: bool) -> None:
+                if cold:
+                    cache.invalidate()
+                expected = telegram.sent() + 1
+                chat_id, username, text = parse_command(update)
+                handle_command(chat_id, username, text, dict(associations))
+                if not telegram.wait_for(expected):
+                    raise RuntimeError("фейковый Bot API не получил ответ на команду")
+
+            results[f"command_round_trip_cold[{size}]"] = measure(lambda: round_trip(True), min(repeat, 20))
+            results[f"command_round_trip_warm[{size}]"] = measure(lambda: round_trip(False), min(repeat, 20))
+
+        for count in chats:
+            broadcaster = Broadcaster("bench-token", api_url=telegram.url)
+            chat_ids = list(range(1, count + 1))
+            text = "🗓️ Games for today:\n\n" + "\n".join(f"🔍SHE | 1{i % 10}:00 | {STAFF[i % len(STAFF)]}" for i in range(8))
+            results[f"broadcast[{count} chats]"] = measure(lambda: broadcaster.broadcast(chat_ids, text), 10)
+
+        run_venues(results)
+    finally:
+        quezzle.stop()
+        telegram.stop()
+
+    results["_phases"] = metrics.REGISTRY.to_dict()["phases"]
+    return results
+
+# ─── Сравнение с базовой линией ───────────────────────────────────────────────
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    regressions = []
+    print(f"\n{'бенчмарк':44} {'база, мс':>10} {'сейчас, мс':>11} {'×':>6}")
+    for name, stats in results.items():
+        if name.startswith("_") or name not in baseline:
+            continue
+        before, after = baseline[name]["median_ms"], stats["median_ms"]
+        ratio = after / before if before else float("inf")
+        mark = ""
+        if ratio > threshold and after - before > MIN_DELTA_MS:
+            mark = "  ⚠️ регрессия"
+            regressions.append(name)
+        elif ratio < 1 / threshold and before - after > MIN_DELTA_MS:
+            mark = "  ✅ быстрее"
+        print(f"{name:44} {before:>10.3f} {after:>11.3f} {ratio:>6.2f}{mark}")
+    return regressions
+
+def print_results(results: Dict[str, Dict]) -> None:
+    print(f"\n{'бенчмарк':44} {'медиана, мс':>12} {'p95, мс':>10} {'повторов':>9}")
+    for name, stats in results.items():
+        if not name.startswith("_"):
+            print(f"{name:44} {stats['median_ms']:>12.3f} {stats['p95_ms']:>10.3f} {stats['runs']:>9}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарки quezzle-telegram-bot")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="размеры таблицы в строках")
+    parser.add_argument("--chats", type=int, nargs="+", default=[1, 10, 50], help="число чатов для рассылки")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="куда сохранить результаты (JSON)")
+    parser.add_argument("--compare", help="базовая линия для сравнения (JSON прошлого прогона)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="порог регрессии по медиане")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.chats)
+    print_results(results)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Результаты: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❗ Регрессии ({len(regressions)}): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
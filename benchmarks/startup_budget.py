@@ -0,0 +1,100 @@
+"""Бюджет времени старта обработчика команд (-X importtime).
+
+    python benchmarks/startup_budget.py                # проверка бюджета, код выхода 1 при превышении
+    python benchmarks/startup_budget.py --budget-ms 80 --top 15
+
+Меряется импорт telegram_commands_handler и весь пустой опрос (getUpdates без апдейтов
+к фейковому Bot API) относительно голого `python -c pass`.
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_telegram import FakeTelegram
+
+# Сколько миллисекунд сверх голого интерпретатора допустимо для пустого опроса
+DEFAULT_BUDGET_MS = 150
+# Эти модули не должны грузиться, пока команде не понадобился скрейп
+FORBIDDEN_MODULES = ("selenium", "webdriver_manager", "quezzle_schedule", "quezzle_browser")
+
+def wall_ms(args: List[str], env: Dict[str, str], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(args, cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def import_profile(env: Dict[str, str]) -> Tuple[float, List[Tuple[str, float]], List[str]]:
+    """Время импорта обработчика, его прямые импорты по убыванию и список всех модулей"""
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", "import telegram_commands_handler"],
+                         cwd=ROOT, env=env, check=True, capture_output=True, text=True)
+    total, top, modules = 0.0, [], []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, raw_name = line[len("import time:"):].split("|")
+        # Вложенные импорты сдвинуты на два пробела за уровень
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        name = raw_name.strip()
+        modules.append(name)
+        if depth == 0 and name == "telegram_commands_handler":
+            total = int(cumulative.strip()) / 1000
+        elif depth == 1:
+            # Прямые импорты обработчика — их и имеет смысл откладывать
+            top.append((name, int(cumulative.strip()) / 1000))
+    return total, sorted(top, key=lambda item: -item[1]), modules
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Бюджет старта telegram_commands_handler")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="допустимо сверх голого python")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="сколько тяжёлых импортов показать")
+    parser.add_argument("--output", help="сохранить результат в JSON")
+    args = parser.parse_args(argv)
+
+    telegram = FakeTelegram().start()
+    env = dict(os.environ, TELEGRAM_TOKEN="bench-token", TELEGRAM_API_URL=telegram.url, GIT_SYNC="0")
+    try:
+        bare = wall_ms([sys.executable, "-c", "pass"], env, args.repeat)
+        noop_poll = wall_ms([sys.executable, "telegram_commands_handler.py"], env, args.repeat)
+        import_total, top, modules = import_profile(env)
+    finally:
+        telegram.stop()
+
+    overhead = noop_poll - bare
+    forbidden = sorted({m for m in modules if m.split(".")[0] in FORBIDDEN_MODULES})
+    print(f"Голый python:             {bare:8.1f} мс")
+    print(f"Пустой опрос (весь run):  {noop_poll:8.1f} мс  (+{overhead:.1f} мс, бюджет +{args.budget_ms:.0f} мс)")
+    print(f"Импорт обработчика:       {import_total:8.1f} мс")
+    print("\nСамые тяжёлые импорты:")
+    for name, ms in top[:args.top]:
+        print(f"  {ms:8.1f} мс  {name}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"bare_ms": bare, "noop_poll_ms": noop_poll, "import_ms": import_total,
+                       "top_imports": top[:args.top], "forbidden": forbidden}, f, ensure_ascii=False, indent=2)
+
+    ok = True
+    if forbidden:
+        print(f"\n❗ При старте загружены тяжёлые модули: {', '.join(forbidden)}")
+        ok = False
+    if overhead > args.budget_ms:
+        print(f"\n❗ Бюджет старта превышен: +{overhead:.1f} мс > +{args.budget_ms:.0f} мс")
+        ok = False
+    if ok:
+        print("\n✅ Старт в пределах бюджета")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
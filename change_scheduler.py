@@ -0,0 +1,137 @@
+import os
+import sys
+import random
+import asyncio
+from datetime import datetime, timedelta, time as dtime
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Tuple
+from quezzle_schedule import tz
+
+# Что проверять: today или horizon N (см. quezzle_schedule.main)
+CHANGE_DETECTION_MODE = os.getenv("CHANGE_DETECTION_MODE", "today")
+# Интервалы опроса, секунды
+CHANGE_MIN_INTERVAL = float(os.getenv("CHANGE_MIN_INTERVAL", "60"))
+CHANGE_BASE_INTERVAL = float(os.getenv("CHANGE_BASE_INTERVAL", "300"))
+CHANGE_IDLE_MAX_INTERVAL = float(os.getenv("CHANGE_IDLE_MAX_INTERVAL", "1800"))
+CHANGE_FAILURE_MAX_INTERVAL = float(os.getenv("CHANGE_FAILURE_MAX_INTERVAL", "3600"))
+# За сколько до начала игры переходим на частый опрос
+CHANGE_NEAR_GAME_WINDOW = timedelta(minutes=int(os.getenv("CHANGE_NEAR_GAME_MINUTES", "120")))
+# Ночью не проверяем вовсе (время Europe/Stockholm)
+CHANGE_QUIET_HOURS = os.getenv("CHANGE_QUIET_HOURS", "23:00-07:00")
+CHANGE_JITTER = 0.1
+# Во сколько раз растёт интервал после каждой проверки без изменений
+IDLE_GROWTH = 1.5
+
+def parse_quiet_hours(value: str) -> Optional[Tuple[dtime, dtime]]:
+    if not value:
+        return None
+    start, end = value.split("-", 1)
+    return dtime.fromisoformat(start.strip()), dtime.fromisoformat(end.strip())
+
+def upcoming_game_times(now: datetime, cache=None) -> List[datetime]:
+    """Начала сегодняшних игр из последнего снимка (без нового скрейпа)"""
+    if cache is None:
+        from schedule_cache import get_schedule_cache
+        cache = get_schedule_cache()
+    snapshot = cache.snapshot
+    if snapshot is None:
+        return []
+    starts = []
+    for booking in snapshot.by_date.get(now.strftime("%Y-%m-%d"), ()):
+        try:
+            start = datetime.strptime(f"{booking.date} {booking.time}", "%Y-%m-%d %H:%M").replace(tzinfo=now.tzinfo)
+        except ValueError:
+            continue
+        if start >= now - timedelta(minutes=30):
+            starts.append(start)
+    return starts
+
+class AdaptiveScheduler:
+    """Проверка изменений внутри демона: чаще перед играми, реже в тишине, пауза ночью"""
+
+    def __init__(self, check: Callable[[], bool],
+                 upcoming: Callable[[datetime], List[datetime]] = upcoming_game_times,
+                 now: Callable[[], datetime] = lambda: datetime.now(tz),
+                 quiet_hours: Optional[Tuple[dtime, dtime]] = parse_quiet_hours(CHANGE_QUIET_HOURS),
+                 executor: Optional[Executor] = None, name: str = "") -> None:
+        self.check = check
+        self.upcoming = upcoming
+        self.now = now
+        self.quiet_hours = quiet_hours
+        # Общий пул площадок ограничивает число одновременных скрейпов
+        self.executor = executor
+        self.name = name
+        self.failures = 0
+        self.idle_streak = 0
+        self.runs = 0
+
+    def seconds_until_quiet_end(self, now: datetime) -> float:
+        """0, если сейчас не тихие часы"""
+        if not self.quiet_hours:
+            return 0
+        start, end = self.quiet_hours
+        current = now.time()
+        in_quiet = start <= current < end if start < end else (current >= start or current < end)
+        if not in_quiet:
+            return 0
+        wake = now.replace(hour=end.hour, minute=end.minute, second=0, microsecond=0)
+        if wake <= now:
+            wake += timedelta(days=1)
+        return (wake - now).total_seconds()
+
+    def next_interval(self) -> float:
+        now = self.now()
+        # Тихие часы важнее всего: ночью не проверяем, даже если сайт перед этим лежал
+        quiet = self.seconds_until_quiet_end(now)
+        if quiet:
+            return quiet + random.uniform(0, CHANGE_MIN_INTERVAL)
+        if self.failures:
+            # Сайт лежит или логин сломался — не долбим его
+            interval = min(CHANGE_FAILURE_MAX_INTERVAL, CHANGE_BASE_INTERVAL * 2 ** (self.failures - 1))
+        else:
+            starts = self.upcoming(now)
+            if any(start - now <= CHANGE_NEAR_GAME_WINDOW for start in starts):
+                interval = CHANGE_MIN_INTERVAL
+            else:
+                interval = min(CHANGE_IDLE_MAX_INTERVAL, CHANGE_BASE_INTERVAL * IDLE_GROWTH ** self.idle_streak)
+                if starts:
+                    # Просыпаемся к началу окна перед ближайшей игрой
+                    until_window = (min(starts) - CHANGE_NEAR_GAME_WINDOW - now).total_seconds()
+                    interval = max(CHANGE_MIN_INTERVAL, min(interval, until_window))
+        interval *= random.uniform(1 - CHANGE_JITTER, 1 + CHANGE_JITTER)
+        # Длинная пауза (бэкофф вечером) не должна закончиться посреди ночи — тогда ждём до утра
+        return interval + self.seconds_until_quiet_end(now + timedelta(seconds=interval))
+
+    def run_once(self) -> None:
+        self.runs += 1
+        try:
+            changed = self.check()
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️ Проверка изменений{self._for()} не удалась ({self.failures} подряд): {e}", file=sys.stderr)
+            return
+        self.failures = 0
+        self.idle_streak = 0 if changed else self.idle_streak + 1
+
+    def _for(self) -> str:
+        return f" ({self.name})" if self.name else ""
+
+    async def run(self, stopping: asyncio.Event) -> None:
+        print(f"⏰ Планировщик проверки изменений{self._for()} запущен (режим {CHANGE_DETECTION_MODE})")
+        # Первая проверка сразу, если не ночь
+        delay = self.seconds_until_quiet_end(self.now())
+        while not stopping.is_set():
+            if delay:
+                print(f"⏰ Следующая проверка{self._for()} через {delay:.0f} с")
+                try:
+                    await asyncio.wait_for(stopping.wait(), delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+            await asyncio.get_running_loop().run_in_executor(self.executor, self.run_once)
+            delay = self.next_interval()
+
+
+def run_scheduled_check(venue=None) -> bool:
+    from quezzle_schedule import run_change_detection
+    return bool(run_change_detection(CHANGE_DETECTION_MODE, venue=venue))
@@ -0,0 +1,207 @@
+import os
+import sys
+import time
+import atexit
+import threading
+import metrics
+from contextlib import contextmanager
+from typing import List, Optional
+from quezzle_browser import setup_driver, login, is_logged_in
+from session_store import cookies_from_driver, cookies_to_driver
+
+# Сколько браузеров держим тёплыми
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "1"))
+# После скольких запросов браузер перезапускается
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "200"))
+# Рост JS-кучи (МБ) относительно первого замера, после которого браузер перезапускается
+DRIVER_MAX_HEAP_GROWTH_MB = int(os.getenv("DRIVER_MAX_HEAP_GROWTH_MB", "150"))
+# Сколько ждём свободный браузер
+DRIVER_ACQUIRE_TIMEOUT = 120
+
+# ─── Один браузер ─────────────────────────────────────────────────────────────
+class PooledDriver:
+    def __init__(self) -> None:
+        started = time.perf_counter()
+        with metrics.timer("driver_start"):
+            self.driver = setup_driver()
+        self.uses = 0
+        self.baseline_heap: Optional[int] = None
+        self.logged_in = False
+        # Площадка (учётная запись), под которой браузер сейчас авторизован
+        self.venue = None
+        try:
+            self.driver.execute_cdp_cmd("Performance.enable", {})
+        except Exception:
+            pass
+        print(f"WebDriver инициализирован за {time.perf_counter() - started:.2f} с")
+
+    def heap_size(self) -> Optional[int]:
+        try:
+            perf = self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+        except Exception:
+            return None
+        for metric in perf:
+            if metric["name"] == "JSHeapUsedSize":
+                return int(metric["value"])
+        return None
+
+    def prepare(self, venue) -> None:
+        """Обновляет таблицу; логинится заново, только если сессия истекла или сменилась площадка"""
+        if self.venue is not None and self.venue.id != venue.id:
+            print(f"WebDriver переключается с площадки {self.venue.name} на {venue.name}")
+            self.driver.delete_all_cookies()
+            self.logged_in = False
+        self.venue = venue
+        if self.logged_in and self.driver.current_url.startswith(venue.link):
+            self.driver.refresh()
+            if is_logged_in(self.driver):
+                return
+            print("Сессия истекла, авторизуемся заново")
+        if not self.logged_in and self.restore_session(venue):
+            self.logged_in = True
+            return
+        started = time.perf_counter()
+        with metrics.timer("login"):
+            login(self.driver, venue.link, venue.username, venue.password)
+        metrics.inc("quezzle_logins_total", backend="selenium")
+        self.logged_in = True
+        print(f"Авторизация успешна за {time.perf_counter() - started:.2f} с")
+        venue.session_store().save(cookies_from_driver(self.driver))
+
+    def restore_session(self, venue) -> bool:
+        """Пробует войти сохранёнными cookie (общими с HTTP-источником) без формы входа"""
+        cookies = venue.session_store().load()
+        if not cookies:
+            return False
+        # Cookie можно поставить только на открытом домене
+        self.driver.get(venue.link)
+        cookies_to_driver(self.driver, cookies)
+        self.driver.refresh()
+        if is_logged_in(self.driver):
+            metrics.inc("quezzle_session_reuse_total", backend="selenium")
+            print("Сессия восстановлена из сохранённых cookie")
+            return True
+        venue.session_store().clear()
+        return False
+
+    def worn_out(self) -> bool:
+        if self.uses >= DRIVER_MAX_USES:
+            print(f"WebDriver отработал {self.uses} запросов, перезапускаем")
+            return True
+        heap = self.heap_size()
+        if heap is None:
+            return False
+        if self.baseline_heap is None:
+            self.baseline_heap = heap
+            return False
+        growth_mb = (heap - self.baseline_heap) / (1024 * 1024)
+        if growth_mb > DRIVER_MAX_HEAP_GROWTH_MB:
+            print(f"WebDriver разросся на {growth_mb:.0f} МБ, перезапускаем")
+            return True
+        return False
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Не удалось закрыть WebDriver: {e}", file=sys.stderr)
+
+# ─── Пул ──────────────────────────────────────────────────────────────────────
+class DriverPool:
+    """Держит запущенные и авторизованные браузеры между запросами"""
+
+    def __init__(self, size: int = DRIVER_POOL_SIZE) -> None:
+        self.size = size
+        self.idle: List[PooledDriver] = []
+        self.created = 0
+        # Ждущих будят и вернувшийся браузер, и освободившееся место (выброшенный браузер)
+        self.cond = threading.Condition()
+        self.closed = False
+
+    def acquire(self, venue=None) -> PooledDriver:
+        deadline = time.monotonic() + DRIVER_ACQUIRE_TIMEOUT
+        with self.cond:
+            while True:
+                # Сначала браузер, уже авторизованный на этой площадке
+                pooled = self._take_idle(venue, exact=True)
+                if pooled is not None:
+                    return pooled
+                # Браузеры запускаем лениво, но не больше size
+                if self.created < self.size:
+                    self.created += 1
+                    break
+                # Пул полон — берём любой свободный, он перелогинится под нужную площадку
+                pooled = self._take_idle(venue, exact=False)
+                if pooled is not None:
+                    return pooled
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    from quezzle_fetchers import FetchError
+                    raise FetchError(f"нет свободного браузера за {DRIVER_ACQUIRE_TIMEOUT} с "
+                                     f"(все {self.size} заняты, DRIVER_POOL_SIZE)")
+                self.cond.wait(remaining)
+        try:
+            return PooledDriver()
+        except Exception:
+            self._forget()
+            raise
+
+    def _take_idle(self, venue, exact: bool) -> Optional[PooledDriver]:
+        # Вызывается под self.cond
+        matches = lambda p: venue is None or (p.venue is not None and p.venue.id == venue.id)
+        chosen = next((p for p in self.idle if matches(p)), None if exact else next(iter(self.idle), None))
+        if chosen is not None:
+            self.idle.remove(chosen)
+        return chosen
+
+    def _forget(self) -> None:
+        with self.cond:
+            self.created -= 1
+            self.cond.notify()
+
+    def release(self, pooled: PooledDriver, broken: bool = False) -> None:
+        pooled.uses += 1
+        if self.closed or broken or pooled.worn_out():
+            self.discard(pooled)
+            return
+        with self.cond:
+            self.idle.append(pooled)
+            self.cond.notify()
+
+    def discard(self, pooled: PooledDriver) -> None:
+        pooled.quit()
+        self._forget()
+
+    @contextmanager
+    def session(self, venue=None):
+        if venue is None:
+            from venues import primary_venue
+            venue = primary_venue()
+        pooled = self.acquire(venue)
+        try:
+            pooled.prepare(venue)
+            yield pooled.driver
+        except Exception:
+            # После ошибки состояние браузера неизвестно — не возвращаем его в пул
+            self.release(pooled, broken=True)
+            raise
+        self.release(pooled)
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for pooled in idle:
+            self.discard(pooled)
+
+
+_pool: Optional[DriverPool] = None
+_pool_lock = threading.Lock()
+
+def get_driver_pool() -> DriverPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+        return _pool
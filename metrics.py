@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Порт для /metrics в режиме демона (0 — не поднимать)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+# CLI-режим: куда выгрузить метрики запуска в JSON ("-" — stdout, пусто — не выгружать)
+METRICS_JSON = os.getenv("METRICS_JSON", "")
+
+# Границы бакетов в секундах: от миллисекунд (разбор) до минуты (холодный Chrome)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Фазы, которые меряем (имена — как в phase="...")
+PHASES = ("driver_start", "login", "table_load", "row_extraction", "filter", "diff",
+          "telegram_send", "git_sync", "command")
+
+# ─── Метрики ──────────────────────────────────────────────────────────────────
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count", "lock")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            cumulative, running = [], 0
+            for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+                running += n
+                cumulative.append((bound, running))
+            return {"count": self.count, "sum": self.total, "buckets": cumulative}
+
+class Registry:
+    """Счётчики и гистограммы с метками; дёшево вызывать из горячего пути"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Tuple], float] = {}
+        self.histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        self.histogram(name, **labels).observe(value)
+
+    @contextmanager
+    def timer(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("quezzle_phase_seconds", time.perf_counter() - started, phase=phase)
+
+    # ─── Выгрузка ─────────────────────────────────────────────────────────────
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            lines.append(f"{name}{_labels(labels)} {value:g}")
+        for (name, labels), histogram in histograms:
+            if name not in seen:
+                lines.append(f"# TYPE {name} histogram")
+                seen.add(name)
+            data = histogram.snapshot()
+            for bound, n in data["buckets"]:
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {n}")
+            lines.append(f"{name}_sum{_labels(labels)} {data['sum']:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {data['count']}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict:
+        with self.lock:
+            counters = list(self.counters.items())
+            histograms = list(self.histograms.items())
+        result: Dict = {"counters": {}, "phases": {}}
+        for (name, labels), value in counters:
+            result["counters"][name + _labels(labels)] = value
+        for (name, labels), histogram in histograms:
+            data = histogram.snapshot()
+            key = dict(labels).get("phase") or name + _labels(labels)
+            result["phases"][key] = {
+                "count": data["count"],
+                "total_s": round(data["sum"], 6),
+                "avg_ms": round(data["sum"] / data["count"] * 1000, 3) if data["count"] else 0,
+            }
+        return result
+
+def _labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+REGISTRY = Registry()
+timer = REGISTRY.timer
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+
+# ─── HTTP /metrics ────────────────────────────────────────────────────────────
+def _metrics_handler():
+    # http.server нужен только демону с METRICS_PORT — разовые запуски его не импортируют
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = REGISTRY.to_prometheus().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(REGISTRY.to_dict(), ensure_ascii=False).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST):
+    if not port:
+        return None
+    from http.server import ThreadingHTTPServer
+    server = ThreadingHTTPServer((host, port), _metrics_handler())
+    # Все фазы видны в /metrics сразу, с нулями — не только после первого замера
+    for phase in PHASES:
+        REGISTRY.histogram("quezzle_phase_seconds", phase=phase)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"📈 Метрики: http://{host}:{port}/metrics")
+    return server
+
+def dump_json(path: Optional[str] = METRICS_JSON) -> None:
+    """CLI-режим: метрики одного запуска в файл или stdout"""
+    if not path:
+        return
+    data = json.dumps(REGISTRY.to_dict(), ensure_ascii=False, indent=2)
+    if path != "-":
+        with open(path, "w") as f:
+            f.write(data)
+    else:
+        print(data)
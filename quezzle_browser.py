@@ -0,0 +1,53 @@
+# Браузерная часть скрейпинга: selenium импортируется только здесь,
+# чтобы команды без скрейпа (и HTTP-источник) его не грузили
+from selenium import webdriver  # type: ignore
+from selenium.webdriver.common.by import By  # type: ignore
+from selenium.webdriver.common.keys import Keys  # type: ignore
+from selenium.webdriver.chrome.service import Service  # type: ignore
+from selenium.webdriver.support.ui import WebDriverWait  # type: ignore
+from selenium.webdriver.support import expected_conditions as EC  # type: ignore
+from webdriver_manager.chrome import ChromeDriverManager  # type: ignore
+from quezzle_schedule import BRAIN_QUEZZLE_USERNAME, BRAIN_QUEZZLE_PASSWORD, BRAIN_QUEZZLE_LINK
+
+# ─── Браузер ──────────────────────────────────────────────────────────────────
+def setup_driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--log-level=3")
+    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+def login(driver, link=BRAIN_QUEZZLE_LINK, username=BRAIN_QUEZZLE_USERNAME, password=BRAIN_QUEZZLE_PASSWORD):
+    driver.get(link)
+    wait = WebDriverWait(driver, 10)
+    wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Logga in')]"))).click()
+    wait.until(EC.visibility_of_element_located((By.NAME, "email"))).send_keys(username)
+    driver.find_element(By.NAME, "password").send_keys(password + Keys.RETURN)
+    wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "avatar-img")))
+
+def is_logged_in(driver):
+    # Дешёвая проверка без ожиданий: аватар есть только у авторизованной сессии
+    return bool(driver.find_elements(By.CLASS_NAME, "avatar-img"))
+
+# Весь текст таблицы одним вызовом вместо find_elements/.text на каждую ячейку
+ROW_TEXTS_SCRIPT = """
+const table = document.querySelector('.table-responsive');
+if (!table) return [];
+return Array.from(table.querySelectorAll('tr'),
+    tr => Array.from(tr.querySelectorAll('td'), td => td.innerText.trim()));
+"""
+
+def get_row_texts(driver):
+    wait = WebDriverWait(driver, 10)
+    wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "table-responsive")))
+    return driver.execute_script(ROW_TEXTS_SCRIPT) or []
+
+TABLE_HTML_SCRIPT = "const t = document.querySelector('.table-responsive'); return t ? t.outerHTML : '';"
+
+def get_table_html(driver):
+    # HTML одной таблицы: по нему считается digest, разбирается он уже без браузера
+    wait = WebDriverWait(driver, 10)
+    wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "table-responsive")))
+    return driver.execute_script(TABLE_HTML_SCRIPT) or ""
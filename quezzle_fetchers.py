@@ -0,0 +1,301 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+import metrics
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from typing import List, Dict, NamedTuple, Optional
+import requests  # type: ignore
+
+# http — только requests, selenium — только браузер, auto — requests с откатом на браузер
+QUEZZLE_FETCHER = os.getenv("QUEZZLE_FETCHER", "auto")
+HTTP_TIMEOUT = 15
+
+class FetchError(Exception):
+    pass
+
+class TableFetch(NamedTuple):
+    digest: str
+    # None — таблица не изменилась с known_digest, разбор пропущен
+    rows: Optional[List[List[str]]]
+
+def digest_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def table_fragment(html: str) -> str:
+    """HTML только самой таблицы: остальная страница (токены, время) меняется при каждой загрузке"""
+    marker = html.find("table-responsive")
+    if marker < 0:
+        raise FetchError("таблица table-responsive не найдена")
+    start = html.rfind("<", 0, marker)
+    end = html.find("</table>", marker)
+    return html[start:end + len("</table>") if end >= 0 else len(html)]
+
+# ─── Разбор HTML ──────────────────────────────────────────────────────────────
+class _BookingTableParser(HTMLParser):
+    """Собирает тексты ячеек всех <tr> внутри div.table-responsive"""
+
+    # Теги, которые в отрисованной странице дают перенос строки (как .text в Selenium)
+    LINE_BREAK_TAGS = {"br", "div", "p", "option", "li"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.rows: List[List[str]] = []
+        self.table_found = False
+        self._div_depth = 0
+        self._table_div_depth: Optional[int] = None
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "div":
+            self._div_depth += 1
+            classes = (dict(attrs).get("class") or "").split()
+            if self._table_div_depth is None and "table-responsive" in classes:
+                self._table_div_depth = self._div_depth
+                self.table_found = True
+        if self._table_div_depth is None:
+            return
+        if tag == "tr":
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = [""]
+        elif tag in self.LINE_BREAK_TAGS and self._cell is not None:
+            self._cell.append("")
+
+    def handle_endtag(self, tag):
+        if self._table_div_depth is not None:
+            if tag == "td" and self._cell is not None and self._row is not None:
+                lines = (" ".join(line.split()) for line in self._cell)
+                self._row.append("\n".join(line for line in lines if line))
+                self._cell = None
+            elif tag == "tr" and self._row is not None:
+                if self._row:
+                    self.rows.append(self._row)
+                self._row = None
+            elif tag in self.LINE_BREAK_TAGS and self._cell is not None:
+                self._cell.append("")
+        if tag == "div":
+            if self._table_div_depth == self._div_depth:
+                self._table_div_depth = None
+            self._div_depth -= 1
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell[-1] += data
+
+def parse_booking_table(html: str) -> List[List[str]]:
+    """Возвращает строки таблицы бронирований как списки текстов ячеек"""
+    parser = _BookingTableParser()
+    parser.feed(html)
+    parser.close()
+    if not parser.table_found:
+        raise FetchError("таблица table-responsive не найдена")
+    return parser.rows
+
+class _LoginFormParser(HTMLParser):
+    """Ищет форму с полем password и собирает её поля"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.action: Optional[str] = None
+        self.fields: Dict[str, str] = {}
+        self.found = False
+        self._form: Optional[Dict[str, str]] = None
+        self._form_action: Optional[str] = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form" and not self.found:
+            self._form = {}
+            self._form_action = attrs.get("action")
+        elif tag == "input" and self._form is not None and attrs.get("name"):
+            self._form[attrs["name"]] = attrs.get("value") or ""
+            if attrs.get("type") == "password":
+                self.found = True
+
+    def handle_endtag(self, tag):
+        if tag == "form" and self._form is not None:
+            if self.found and self.action is None:
+                self.action = self._form_action or ""
+                self.fields = self._form
+            self._form = None
+
+# ─── Источники данных ─────────────────────────────────────────────────────────
+class BookingFetcher:
+    """Интерфейс источника строк таблицы бронирований"""
+
+    name = "base"
+
+    def fetch_rows(self) -> List[List[str]]:
+        raise NotImplementedError
+
+    def fetch_table(self, known_digest: Optional[str] = None) -> TableFetch:
+        """Строки таблицы вместе с digest; rows=None, если digest совпал с known_digest"""
+        rows = self.fetch_rows()
+        digest = digest_text(json.dumps(rows, ensure_ascii=False))
+        return TableFetch(digest, None if digest == known_digest else rows)
+
+def _venue_or_primary(venue):
+    if venue is not None:
+        return venue
+    from venues import primary_venue
+    return primary_venue()
+
+class SeleniumFetcher(BookingFetcher):
+    """Браузеры общего пула; площадка определяет, под какой учётной записью входить"""
+
+    name = "selenium"
+
+    def __init__(self, venue=None) -> None:
+        self.venue = _venue_or_primary(venue)
+
+    def fetch_rows(self) -> List[List[str]]:
+        from driver_pool import get_driver_pool
+        from quezzle_browser import get_row_texts
+        with get_driver_pool().session(self.venue) as driver:
+            return get_row_texts(driver)
+
+    def fetch_table(self, known_digest: Optional[str] = None) -> TableFetch:
+        from driver_pool import get_driver_pool
+        from quezzle_browser import get_table_html
+        with get_driver_pool().session(self.venue) as driver:
+            html = get_table_html(driver)
+        digest = digest_text(html)
+        if digest == known_digest:
+            return TableFetch(digest, None)
+        return TableFetch(digest, parse_booking_table(html))
+
+class HttpFetcher(BookingFetcher):
+    """Повторяет вход через requests.Session и разбирает HTML без браузера"""
+
+    name = "http"
+
+    def __init__(self, venue=None) -> None:
+        self.venue = _venue_or_primary(venue)
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "Mozilla/5.0 (quezzle-telegram-bot)"
+        self.lock = threading.Lock()
+        self.validators: Dict[str, Optional[str]] = {}
+        # Cookie прошлой сессии (в том числе от Selenium) — вход не нужен, пока они живы
+        from session_store import cookies_to_jar
+        self.sessions = self.venue.session_store()
+        cookies_to_jar(self.session.cookies, self.sessions.load())
+
+    def login(self, html: str) -> None:
+        form = _LoginFormParser()
+        form.feed(html)
+        if not form.found and not self.venue.login_url:
+            raise FetchError("форма входа не найдена в HTML (страница рисуется скриптом?)")
+        fields = dict(form.fields)
+        fields["email"] = self.venue.username
+        fields["password"] = self.venue.password
+        url = self.venue.login_url or urljoin(self.venue.link, form.action or "")
+        with metrics.timer("login"):
+            res = self.session.post(url, data=fields, timeout=HTTP_TIMEOUT)
+            res.raise_for_status()
+        metrics.inc("quezzle_logins_total", backend="http")
+        print(f"Авторизация (HTTP) успешна ({self.venue.name})")
+        from session_store import cookies_from_jar
+        self.sessions.save(cookies_from_jar(self.session.cookies))
+
+    def fetch_rows(self) -> List[List[str]]:
+        return self.fetch_table().rows
+
+    def fetch_table(self, known_digest: Optional[str] = None) -> TableFetch:
+        with self.lock:
+            headers = {}
+            if known_digest and self.validators.get("digest") == known_digest:
+                # Сервер может сам сказать, что ничего не менялось (304)
+                if self.validators.get("etag"):
+                    headers["If-None-Match"] = self.validators["etag"]
+                if self.validators.get("last_modified"):
+                    headers["If-Modified-Since"] = self.validators["last_modified"]
+            res = self.session.get(self.venue.link, headers=headers, timeout=HTTP_TIMEOUT)
+            if res.status_code == 304:
+                return TableFetch(known_digest, None)
+            res.raise_for_status()
+            if "table-responsive" not in res.text:
+                # Cookie протухли — логинимся и запрашиваем заново
+                self.session.cookies.clear()
+                self.login(res.text)
+                res = self.session.get(self.venue.link, timeout=HTTP_TIMEOUT)
+                res.raise_for_status()
+            fragment = table_fragment(res.text)
+            digest = digest_text(fragment)
+            self.validators = {
+                "etag": res.headers.get("ETag"),
+                "last_modified": res.headers.get("Last-Modified"),
+                "digest": digest,
+            }
+            if digest == known_digest:
+                return TableFetch(digest, None)
+            return TableFetch(digest, parse_booking_table(fragment))
+
+class FileFetcher(BookingFetcher):
+    """Читает сохранённую страницу — для офлайн-проверки разбора"""
+
+    name = "file"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def fetch_rows(self) -> List[List[str]]:
+        return self.fetch_table().rows
+
+    def fetch_table(self, known_digest: Optional[str] = None) -> TableFetch:
+        with open(self.path, "r", encoding="utf-8") as f:
+            fragment = table_fragment(f.read())
+        digest = digest_text(fragment)
+        return TableFetch(digest, None if digest == known_digest else parse_booking_table(fragment))
+
+class FallbackFetcher(BookingFetcher):
+    """Пробует источники по очереди; первый успешный запоминается"""
+
+    name = "auto"
+
+    def __init__(self, fetchers: List[BookingFetcher]) -> None:
+        self.fetchers = fetchers
+
+    def fetch_rows(self) -> List[List[str]]:
+        return self._first_success(lambda fetcher: fetcher.fetch_rows())
+
+    def fetch_table(self, known_digest: Optional[str] = None) -> TableFetch:
+        return self._first_success(lambda fetcher: fetcher.fetch_table(known_digest))
+
+    def _first_success(self, call):
+        errors = []
+        for fetcher in list(self.fetchers):
+            try:
+                result = call(fetcher)
+            except Exception as e:
+                print(f"⚠️ Источник {fetcher.name} не сработал: {e}", file=sys.stderr)
+                metrics.inc("quezzle_fetch_failures_total", fetcher=fetcher.name)
+                errors.append(f"{fetcher.name}: {e}")
+                continue
+            if fetcher is not self.fetchers[0]:
+                # Дальше сразу идём в рабочий источник, не тратя время на упавший
+                self.fetchers.remove(fetcher)
+                self.fetchers.insert(0, fetcher)
+            return result
+        raise FetchError("; ".join(errors))
+
+
+def make_fetcher(venue=None) -> BookingFetcher:
+    if QUEZZLE_FETCHER == "http":
+        return HttpFetcher(venue)
+    if QUEZZLE_FETCHER == "selenium":
+        return SeleniumFetcher(venue)
+    return FallbackFetcher([HttpFetcher(venue), SeleniumFetcher(venue)])
+
+
+if __name__ == "__main__":
+    # Офлайн-проверка: python quezzle_fetchers.py fixtures/booking_table.html 2025-06-14
+    from quezzle_schedule import get_games_by_date
+    rows = FileFetcher(sys.argv[1]).fetch_rows()
+    print(f"Строк в таблице: {len(rows)}")
+    if len(sys.argv) > 2:
+        for game in get_games_by_date(rows, sys.argv[2]):
+            print(f"{game['game']} | {game['time']} | {game['responsible']!r}")
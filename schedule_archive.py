@@ -0,0 +1,144 @@
+import os
+import re
+import gzip
+import json
+import time
+import uuid
+import threading
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+from schedule_diff import CANCELLED, ChangeSet
+from state_store import ARCHIVE_DIR
+
+# Архивировать каждый изменившийся снимок и дифф (история не теряется при перезаписи last_state.json)
+SCHEDULE_ARCHIVE = os.getenv("SCHEDULE_ARCHIVE", "1") == "1"
+MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+# Месячные файлы прежнего формата (дописывались на месте) — только читаем
+LEGACY_SEGMENT_RE = re.compile(r"^(\d{4}-\d{2})\.jsonl\.gz$")
+
+def segment_month(schedule_date: str) -> str:
+    # Каталог на месяц дат расписания: диапазон дат читает только свои месяцы
+    return schedule_date[:7]
+
+_seq_lock = threading.Lock()
+_last_seq = 0
+
+def next_seq() -> int:
+    """Метка прогона в наносекундах, строго растущая внутри процесса: ts в секундах
+    не упорядочивает два прогона в одну секунду"""
+    global _last_seq
+    with _seq_lock:
+        _last_seq = max(time.time_ns(), _last_seq + 1)
+        return _last_seq
+
+def record_order(record: Dict) -> int:
+    # У старых записей seq нет — только секунды
+    return record.get("seq") or record["ts"] * 1_000_000_000
+
+class ScheduleArchive:
+    """Архив только на дозапись: каждый прогон — новый неизменяемый gzip-JSONL сегмент
+    в каталоге месяца. Архив выгружается в git, поэтому уже записанные файлы не трогаем:
+    коммит добавляет только новый сегмент, а не переписывает растущий месячный файл"""
+
+    def __init__(self, root: str = ARCHIVE_DIR) -> None:
+        self.root = root
+        self.lock = threading.Lock()
+
+    def append(self, records: List[Dict], seq: Optional[int] = None) -> None:
+        if not records:
+            return
+        seq = seq or next_seq()
+        by_month: Dict[str, List[Dict]] = {}
+        for record in records:
+            by_month.setdefault(segment_month(record["date"]), []).append(record)
+        # seq в имени — сегменты читаются в порядке прогонов; случайный хвост — от совпадений между процессами
+        name = f"{seq:020d}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+        with self.lock:
+            for month, items in by_month.items():
+                directory = os.path.join(self.root, month)
+                os.makedirs(directory, exist_ok=True)
+                data = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in items)
+                path = os.path.join(directory, name)
+                # mtime=0 — одинаковые данные дают одинаковые байты
+                with open(f"{path}.tmp", "wb") as f:
+                    f.write(gzip.compress(data.encode("utf-8"), mtime=0))
+                os.replace(f"{path}.tmp", path)
+
+    def record(self, states: Dict[str, List[Dict[str, str]]], changes: Optional[ChangeSet] = None) -> None:
+        """Снимки по датам и изменения одного прогона"""
+        seq = next_seq()
+        ts = seq // 1_000_000_000
+        records = [{"type": "snapshot", "ts": ts, "seq": seq, "date": d, "games": games} for d, games in states.items()]
+        if changes:
+            records += [{"type": "change", "ts": ts, "seq": seq, **change.as_dict()} for change in changes]
+        self.append(records, seq)
+
+    def segments(self, start: str, end: str) -> List[str]:
+        """Пути сегментов, в которых могут быть даты из [start, end]"""
+        first, last = segment_month(start), segment_month(end)
+        paths = []
+        names = sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []
+        for name in names:
+            legacy = LEGACY_SEGMENT_RE.match(name)
+            if legacy and first <= legacy.group(1) <= last:
+                paths.append(os.path.join(self.root, name))
+            elif MONTH_RE.match(name) and first <= name <= last:
+                directory = os.path.join(self.root, name)
+                paths += [os.path.join(directory, f) for f in sorted(os.listdir(directory)) if f.endswith(".jsonl.gz")]
+        return paths
+
+    def scan(self, start: str, end: str, record_type: Optional[str] = None) -> Iterator[Dict]:
+        """Записи с датой в [start, end] по одной — память не зависит от размера архива"""
+        for path in self.segments(start, end):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if start <= record["date"] <= end and (record_type is None or record["type"] == record_type):
+                        yield record
+
+# ─── Статистика ───────────────────────────────────────────────────────────────
+def compute_stats(archive: ScheduleArchive, start: str, end: str) -> Dict:
+    """Нагрузка по ведущим, брони по играм и отмены за период — одним проходом по сегментам"""
+    # На дату держим только счётчики последнего снимка, а не сами игры
+    latest: Dict[str, Tuple[int, Counter, Counter]] = {}
+    cancelled: Counter = Counter()
+    for record in archive.scan(start, end):
+        if record["type"] == "snapshot":
+            known = latest.get(record["date"])
+            order = record_order(record)
+            if known is None or order >= known[0]:
+                games = record["games"]
+                latest[record["date"]] = (
+                    order,
+                    Counter(g["responsible"] for g in games),
+                    Counter(g["game"][:3] for g in games),
+                )
+        elif record.get("kind") == CANCELLED:
+            cancelled[record["game"][:3]] += 1
+
+    by_master: Counter = Counter()
+    by_game: Counter = Counter()
+    for _, masters, games in latest.values():
+        by_master.update(masters)
+        by_game.update(games)
+    return {
+        "from": start,
+        "to": end,
+        "days": len(latest),
+        "bookings": sum(by_game.values()),
+        "by_master": dict(by_master.most_common()),
+        "by_game": dict(by_game.most_common()),
+        "cancelled": dict(cancelled),
+    }
+
+
+def get_schedule_archive() -> ScheduleArchive:
+    """Архив основной площадки (у каждой площадки свой — см. venues.Venue.archive)"""
+    from venues import primary_venue
+    return primary_venue().archive()
+
+
+if __name__ == "__main__":
+    # Офлайн-просмотр: python schedule_archive.py 2025-06-01 2025-06-30
+    import sys
+    print(json.dumps(compute_stats(get_schedule_archive(), sys.argv[1], sys.argv[2]), ensure_ascii=False, indent=2))
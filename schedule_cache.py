@@ -0,0 +1,85 @@
+import os
+import time
+import threading
+import metrics
+from concurrent.futures import Future
+from typing import Callable, Optional
+from schedule_snapshot import ScheduleSnapshot
+
+# Сколько секунд снимок таблицы считается свежим для команд /today, /tomorrow, /date
+SCHEDULE_CACHE_TTL = float(os.getenv("SCHEDULE_CACHE_TTL", "60"))
+
+class ScheduleCache:
+    """Один снимок таблицы на все даты; параллельные запросы ждут один общий скрейп"""
+
+    def __init__(self, loader: Callable[[Optional[str]], Optional[ScheduleSnapshot]], ttl: float = SCHEDULE_CACHE_TTL) -> None:
+        self.loader = loader
+        self.ttl = ttl
+        self.snapshot: Optional[ScheduleSnapshot] = None
+        self.loaded_at = 0.0
+        self.lock = threading.Lock()
+        self.inflight: Optional[Future] = None
+        self.hits = 0
+        self.misses = 0
+        self.unchanged = 0
+
+    def _fresh(self) -> bool:
+        return self.snapshot is not None and time.monotonic() - self.loaded_at < self.ttl
+
+    def get(self, force: bool = False) -> ScheduleSnapshot:
+        with self.lock:
+            if not force and self._fresh():
+                self.hits += 1
+                metrics.inc("quezzle_cache_requests_total", result="hit")
+                return self.snapshot
+            if self.inflight is None:
+                self.misses += 1
+                metrics.inc("quezzle_cache_requests_total", result="miss")
+                self.inflight = future = Future()
+                leader = True
+                previous = self.snapshot
+            else:
+                # Скрейп уже идёт — просто ждём его результат
+                future = self.inflight
+                leader = False
+                metrics.inc("quezzle_cache_requests_total", result="shared")
+
+        if not leader:
+            return future.result()
+
+        try:
+            # Загрузчик вернёт None, если таблица та же, что в прошлом снимке
+            snapshot = self.loader(previous.digest if previous else None)
+            if snapshot is None:
+                self.unchanged += 1
+                snapshot = previous
+        except Exception as e:
+            with self.lock:
+                self.inflight = None
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self.snapshot = snapshot
+            self.loaded_at = time.monotonic()
+            self.inflight = None
+        future.set_result(snapshot)
+        return snapshot
+
+    def refresh(self) -> ScheduleSnapshot:
+        """Всегда скрейпит заново и кладёт результат в кэш (для проверки изменений)"""
+        return self.get(force=True)
+
+    def put(self, snapshot: ScheduleSnapshot) -> None:
+        with self.lock:
+            self.snapshot = snapshot
+            self.loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.snapshot = None
+
+
+def get_schedule_cache() -> ScheduleCache:
+    """Снимок основной площадки (у каждой площадки свой кэш — см. venues.Venue.cache)"""
+    from venues import primary_venue
+    return primary_venue().cache()
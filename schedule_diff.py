@@ -0,0 +1,90 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+ADDED = "added"
+CANCELLED = "cancelled"
+MOVED = "moved"
+REASSIGNED = "reassigned"
+
+class Change(NamedTuple):
+    kind: str
+    game: str
+    date: str
+    time: str
+    responsible: str
+    old_date: str = ""
+    old_time: str = ""
+    old_responsible: str = ""
+
+    def as_dict(self) -> Dict[str, str]:
+        return {key: value for key, value in self._asdict().items() if value}
+
+class ChangeSet:
+    """Список изменений расписания с индексом по дате и виду"""
+
+    __slots__ = ("changes", "_by_date")
+
+    def __init__(self, changes: List[Change]) -> None:
+        self.changes = changes
+        self._by_date: Optional[Dict[str, "ChangeSet"]] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def __iter__(self) -> Iterator[Change]:
+        return iter(self.changes)
+
+    def of_kind(self, kind: str) -> List[Change]:
+        return [c for c in self.changes if c.kind == kind]
+
+    def for_date(self, date: str) -> "ChangeSet":
+        if self._by_date is None:
+            grouped: Dict[str, List[Change]] = defaultdict(list)
+            for change in self.changes:
+                grouped[change.date].append(change)
+            self._by_date = {d: ChangeSet(c) for d, c in grouped.items()}
+        return self._by_date.get(date) or ChangeSet([])
+
+    def dates(self) -> List[str]:
+        return sorted({c.date for c in self.changes})
+
+    def to_dict(self) -> Dict:
+        counts: Dict[str, int] = defaultdict(int)
+        for change in self.changes:
+            counts[change.kind] += 1
+        return {"counts": dict(counts), "changes": [c.as_dict() for c in self.changes]}
+
+def _index(by_date: Dict[str, Iterable[Dict[str, str]]]) -> Iterator[Tuple[Tuple[str, int], str, Dict[str, str]]]:
+    # Номер брони уникален; если вдруг повторяется — различаем по порядку появления
+    seen: Dict[str, int] = defaultdict(int)
+    for date, games in by_date.items():
+        for game in games:
+            n = seen[game["game"]]
+            seen[game["game"]] += 1
+            yield (game["game"], n), date, game
+
+def diff_dates(previous: Dict[str, Iterable[Dict[str, str]]], current: Dict[str, Iterable[Dict[str, str]]]) -> ChangeSet:
+    """Один проход по старому и новому состоянию (сразу за много дат)"""
+    old = {key: (date, game) for key, date, game in _index(previous)}
+    changes: List[Change] = []
+    for key, date, game in _index(current):
+        found = old.pop(key, None)
+        if found is None:
+            changes.append(Change(ADDED, game["game"], date, game["time"], game["responsible"]))
+            continue
+        old_date, old_game = found
+        if old_date != date or old_game["time"] != game["time"]:
+            changes.append(Change(MOVED, game["game"], date, game["time"], game["responsible"],
+                                  old_date=old_date, old_time=old_game["time"]))
+        if old_game["responsible"] != game["responsible"]:
+            changes.append(Change(REASSIGNED, game["game"], date, game["time"], game["responsible"],
+                                  old_responsible=old_game["responsible"]))
+    for old_date, old_game in old.values():
+        changes.append(Change(CANCELLED, old_game["game"], old_date, old_game["time"], old_game["responsible"]))
+    return ChangeSet(changes)
+
+def diff_games(previous: List[Dict[str, str]], current: List[Dict[str, str]], date: str) -> ChangeSet:
+    return diff_dates({date: previous}, {date: current})
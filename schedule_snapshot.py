@@ -0,0 +1,80 @@
+import time
+import metrics
+from collections import defaultdict
+from typing import List, Dict, NamedTuple, Iterable, Optional
+
+# Минимум ячеек у строки настоящего бронирования
+MIN_BOOKING_CELLS = 10
+
+class Booking(NamedTuple):
+    game: str
+    date: str
+    time: str
+    responsible: str
+
+    def as_dict(self) -> Dict[str, str]:
+        # Формат, который хранится в last_state.json
+        return {"game": self.game, "time": self.time, "responsible": self.responsible}
+
+def parse_bookings(rows: Iterable[List[str]]) -> List[Booking]:
+    bookings = []
+    for cells in rows:
+        if len(cells) < MIN_BOOKING_CELLS:
+            continue
+        bookings.append(Booking(
+            cells[0].strip(),
+            cells[1].strip()[:10],
+            cells[2].strip(),
+            cells[3].strip(),
+        ))
+    return bookings
+
+class ScheduleSnapshot:
+    """Вся таблица бронирований за один снимок, проиндексированная по датам"""
+
+    __slots__ = ("bookings", "by_date", "fetched_at", "timings", "digest")
+
+    def __init__(self, bookings: List[Booking], fetched_at: float = 0.0, digest: str = "") -> None:
+        self.bookings = bookings
+        self.digest = digest
+        self.fetched_at = fetched_at or time.time()
+        self.timings: Dict[str, float] = {}
+        self.by_date: Dict[str, List[Booking]] = defaultdict(list)
+        for booking in bookings:
+            self.by_date[booking.date].append(booking)
+
+    @classmethod
+    def from_rows(cls, rows: List[List[str]]) -> "ScheduleSnapshot":
+        started = time.perf_counter()
+        snapshot = cls(parse_bookings(rows))
+        snapshot.timings["parse"] = time.perf_counter() - started
+        metrics.observe("quezzle_phase_seconds", snapshot.timings["parse"], phase="row_extraction")
+        return snapshot
+
+    def games_for(self, target_date: str) -> List[Dict[str, str]]:
+        started = time.perf_counter()
+        games = [b.as_dict() for b in self.by_date.get(target_date, ())]
+        self.timings["filter"] = time.perf_counter() - started
+        metrics.observe("quezzle_phase_seconds", self.timings["filter"], phase="filter")
+        return games
+
+    def dates(self) -> List[str]:
+        return sorted(self.by_date)
+
+    def format_timings(self) -> str:
+        return ", ".join(f"{phase} {seconds * 1000:.1f} мс" for phase, seconds in self.timings.items())
+
+def fetch_snapshot(fetcher, known_digest: Optional[str] = None) -> Optional[ScheduleSnapshot]:
+    """Один запрос к источнику — и ответы на любые даты из памяти.
+    None, если таблица не изменилась с known_digest (разбор не делается)"""
+    started = time.perf_counter()
+    table = fetcher.fetch_table(known_digest)
+    fetched = time.perf_counter() - started
+    metrics.observe("quezzle_phase_seconds", fetched, phase="table_load")
+    if table.rows is None:
+        print(f"⚡ Таблица не изменилась (fetch {fetched * 1000:.1f} мс), разбор пропущен")
+        return None
+    snapshot = ScheduleSnapshot.from_rows(table.rows)
+    snapshot.digest = table.digest
+    snapshot.timings = {"fetch": fetched, **snapshot.timings}
+    return snapshot
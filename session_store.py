@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import threading
+from typing import Dict, List
+from dotenv import load_dotenv
+load_dotenv()
+
+try:
+    # Необязательная зависимость: без неё (или без ключа) cookie не сохраняются
+    from cryptography.fernet import Fernet, InvalidToken  # type: ignore
+except ImportError:
+    Fernet = None
+    InvalidToken = ValueError
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Зашифрованные cookie сайта бронирований; файл не коммитится
+SESSION_FILE = os.getenv("QUEZZLE_SESSION_FILE", os.path.join(BASE_DIR, ".quezzle_session"))
+# Любая строка-пароль; из неё выводится ключ Fernet
+SESSION_KEY = os.getenv("QUEZZLE_SESSION_KEY", "")
+# Сессия без срока в cookie считается живой столько секунд (дальше — проверка на сайте)
+SESSION_MAX_AGE = int(os.getenv("QUEZZLE_SESSION_MAX_AGE", str(12 * 3600)))
+
+# Общий формат cookie для обоих источников: name, value, domain, path, expiry, secure
+COOKIE_FIELDS = ("name", "value", "domain", "path", "expiry", "secure")
+
+def fernet_key(passphrase: str) -> bytes:
+    return base64.urlsafe_b64encode(hashlib.sha256(passphrase.encode()).digest())
+
+class SessionStore:
+    """Cookie авторизованной сессии: шифруются на диске, общие для HTTP- и Selenium-источника"""
+
+    def __init__(self, path: str = SESSION_FILE, key: str = SESSION_KEY) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.fernet = Fernet(fernet_key(key)) if Fernet is not None and key else None
+        if key and Fernet is None:
+            print("⚠️ QUEZZLE_SESSION_KEY задан, но cryptography не установлен — cookie не сохраняются",
+                  file=sys.stderr)
+
+    @property
+    def enabled(self) -> bool:
+        return self.fernet is not None
+
+    def load(self) -> List[Dict]:
+        """Непросроченные cookie прошлой сессии или пустой список"""
+        if not self.enabled or not os.path.exists(self.path):
+            return []
+        with self.lock:
+            try:
+                with open(self.path, "rb") as f:
+                    data = json.loads(self.fernet.decrypt(f.read(), ttl=SESSION_MAX_AGE))
+            except (InvalidToken, ValueError, OSError) as e:
+                # Чужой ключ, повреждённый файл или сессия старше SESSION_MAX_AGE
+                print(f"⚠️ Сохранённая сессия не подходит ({type(e).__name__}), нужен вход")
+                return []
+        now = time.time()
+        return [c for c in data.get("cookies", []) if not c.get("expiry") or c["expiry"] > now]
+
+    def save(self, cookies: List[Dict]) -> None:
+        if not self.enabled:
+            return
+        payload = json.dumps({"saved_at": int(time.time()), "cookies": [
+            {k: c[k] for k in COOKIE_FIELDS if c.get(k) is not None} for c in cookies
+        ]}).encode()
+        with self.lock:
+            tmp = self.path + ".tmp"
+            # Файл с cookie читает только владелец
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.fernet.encrypt(payload))
+            os.replace(tmp, self.path)
+        print(f"🍪 Сессия сохранена ({len(cookies)} cookie)")
+
+    def clear(self) -> None:
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+# ─── Перевод между форматами источников ───────────────────────────────────────
+def cookies_from_jar(jar) -> List[Dict]:
+    return [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+             "expiry": c.expires, "secure": c.secure} for c in jar]
+
+def cookies_to_jar(jar, cookies: List[Dict]) -> None:
+    for c in cookies:
+        jar.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"),
+                expires=c.get("expiry"), secure=c.get("secure", False))
+
+def cookies_from_driver(driver) -> List[Dict]:
+    return [{k: c.get(k) for k in COOKIE_FIELDS} for c in driver.get_cookies()]
+
+def cookies_to_driver(driver, cookies: List[Dict]) -> None:
+    # Selenium принимает cookie только для домена открытой страницы
+    for c in cookies:
+        cookie = {k: c[k] for k in COOKIE_FIELDS if c.get(k) is not None}
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            print(f"⚠️ Cookie {c['name']} не принят браузером: {e}", file=sys.stderr)
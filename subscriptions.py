@@ -0,0 +1,177 @@
+import bisect
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from associations_index import AssociationIndex
+from schedule_diff import Change, ChangeSet, MOVED, REASSIGNED
+
+SUBSCRIPTIONS_META_KEY = "subscriptions"
+
+class Subscription(NamedTuple):
+    """Фильтр чата; все заданные условия должны выполняться одновременно"""
+    mine: bool = False
+    games: Tuple[str, ...] = ()
+    hours: Optional[int] = None
+    username: str = ""
+
+    @property
+    def filtered(self) -> bool:
+        return self.mine or bool(self.games) or self.hours is not None
+
+    def as_dict(self) -> Dict:
+        return {"mine": self.mine, "games": list(self.games), "hours": self.hours, "username": self.username}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Subscription":
+        return cls(bool(data.get("mine")), tuple(data.get("games") or ()), data.get("hours"), data.get("username") or "")
+
+    def describe(self) -> str:
+        if not self.filtered:
+            return "all schedule changes"
+        parts = []
+        if self.mine:
+            parts.append("only your own games")
+        if self.games:
+            parts.append("only " + ", ".join(self.games))
+        if self.hours is not None:
+            parts.append(f"only games within {self.hours}h")
+        return "; ".join(parts)
+
+def parse_subscription(args: List[str], known_games: Iterable[str], username: str) -> Subscription:
+    """/subscribe mine SHE FRO 3h → Subscription; ValueError с текстом для пользователя"""
+    known = set(known_games)
+    mine, games, hours = False, [], None
+    for arg in args:
+        token = arg.strip().upper()
+        if token == "ALL":
+            return Subscription()
+        if token == "MINE":
+            mine = True
+        elif token in known:
+            games.append(token)
+        elif token.endswith("H") and token[:-1].isdigit() and int(token[:-1]) > 0:
+            hours = int(token[:-1])
+        else:
+            raise ValueError(f"Unknown filter: {arg}")
+    return Subscription(mine, tuple(sorted(set(games))), hours, username if mine else "")
+
+# ─── Индекс подписок ──────────────────────────────────────────────────────────
+def game_time(date: str, time: str, tz) -> Optional[datetime]:
+    try:
+        return datetime.strptime(f"{date} {time[:5]}", "%Y-%m-%d %H:%M").replace(tzinfo=tz)
+    except ValueError:
+        return None
+
+class SubscriptionIndex:
+    """Подписки, разложенные по самому избирательному условию.
+    На изменение смотрят только подходящие чаты, а не все чаты × все изменения"""
+
+    def __init__(self, subscriptions: Optional[Dict[int, Subscription]] = None) -> None:
+        self.lock = threading.Lock()
+        self.subscriptions: Dict[int, Subscription] = dict(subscriptions or {})
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        by_user: Dict[str, Set[int]] = defaultdict(set)
+        by_game: Dict[str, Set[int]] = defaultdict(set)
+        by_time: Dict[int, Set[int]] = defaultdict(set)
+        for chat_id, sub in self.subscriptions.items():
+            if sub.mine:
+                by_user[sub.username].add(chat_id)
+            elif sub.games:
+                for game in sub.games:
+                    by_game[game].add(chat_id)
+            elif sub.hours is not None:
+                # Корзина — длина окна: изменению через 5 ч подходят только корзины от 5 ч
+                by_time[sub.hours].add(chat_id)
+        self._by_user, self._by_game = dict(by_user), dict(by_game)
+        self._time_buckets = sorted(by_time)
+        self._by_time = [by_time[hours] for hours in self._time_buckets]
+
+    def set(self, chat_id: int, sub: Subscription) -> None:
+        with self.lock:
+            if sub.filtered:
+                self.subscriptions[chat_id] = sub
+            else:
+                self.subscriptions.pop(chat_id, None)
+            self._rebuild()
+
+    def get(self, chat_id: int) -> Subscription:
+        return self.subscriptions.get(chat_id, Subscription())
+
+    def filtered_chats(self) -> Set[int]:
+        return set(self.subscriptions)
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return {str(chat_id): sub.as_dict() for chat_id, sub in self.subscriptions.items()}
+
+    def _times(self, change: Change, now: datetime) -> List[Optional[datetime]]:
+        times = [game_time(change.date, change.time, now.tzinfo)]
+        if change.kind == MOVED:
+            times.append(game_time(change.old_date or change.date, change.old_time, now.tzinfo))
+        return times
+
+    def _lead_hours(self, change: Change, now: datetime) -> Optional[float]:
+        """Через сколько часов ближайшее время изменения; None — уже прошло.
+        Время не разобрать — 0: лучше прислать лишнее, чем потерять изменение"""
+        leads = [0.0 if t is None else (t - now).total_seconds() / 3600 for t in self._times(change, now)]
+        leads = [lead for lead in leads if lead >= 0]
+        return min(leads) if leads else None
+
+    def _matches(self, sub: Subscription, change: Change, usernames: Set[str], lead: Optional[float]) -> bool:
+        if sub.mine and sub.username not in usernames:
+            return False
+        if sub.games and change.game[:3] not in sub.games:
+            return False
+        if sub.hours is not None and (lead is None or lead > sub.hours):
+            return False
+        return True
+
+    def route(self, changes: ChangeSet, names: AssociationIndex, now: datetime) -> Dict[int, List[Change]]:
+        """Изменения для каждого чата с фильтром; чаты без фильтра сюда не попадают"""
+        routed: Dict[int, List[Change]] = defaultdict(list)
+        with self.lock:
+            by_user, by_game = self._by_user, self._by_game
+            time_buckets, by_time = self._time_buckets, self._by_time
+            subscriptions = self.subscriptions
+        for change in changes:
+            usernames = {names.lookup(change.responsible)}
+            if change.kind == REASSIGNED:
+                usernames.add(names.lookup(change.old_responsible))
+            usernames.discard(None)
+            # Время изменения разбираем один раз, а не для каждого чата
+            lead = self._lead_hours(change, now)
+            if lead is not None:
+                # Только корзины с окном не короче срока до игры; у этих чатов других условий нет
+                for chats in by_time[bisect.bisect_left(time_buckets, lead):]:
+                    for chat_id in chats:
+                        routed[chat_id].append(change)
+            candidates: Set[int] = set()
+            for username in usernames:
+                candidates |= by_user.get(username, set())
+            candidates |= by_game.get(change.game[:3], set())
+            for chat_id in candidates:
+                if self._matches(subscriptions[chat_id], change, usernames, lead):
+                    routed[chat_id].append(change)
+        return dict(routed)
+
+
+_index: Optional[SubscriptionIndex] = None
+_index_lock = threading.Lock()
+
+def get_subscription_index() -> SubscriptionIndex:
+    """Подписки грузятся из хранилища один раз и дальше обновляются командой /subscribe"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from state_store import get_state_store
+            data = get_state_store().load_meta(SUBSCRIPTIONS_META_KEY, {})
+            _index = SubscriptionIndex({int(k): Subscription.from_dict(v) for k, v in data.items()})
+        return _index
+
+def save_subscription(chat_id: int, sub: Subscription) -> None:
+    from state_store import get_state_store
+    index = get_subscription_index()
+    index.set(chat_id, sub)
+    get_state_store().save_meta(SUBSCRIPTIONS_META_KEY, index.as_dict())
@@ -0,0 +1,241 @@
+import os
+import sys
+import signal
+import asyncio
+import requests
+import metrics
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from dotenv import load_dotenv
+from state_store import get_state_store, get_git_exporter
+from telegram_commands_handler import (
+    ASSOCIATIONS_FILE,
+    OFFSET_FILE,
+    CHAT_IDS_FILE,
+    TOKEN,
+    API_URL,
+    load_offset,
+    save_offset,
+    load_associations,
+    save_associations,
+    add_chat_id,
+    parse_command,
+    handle_command,
+    is_scrape_command,
+    CommandPool,
+    git_commit_files,
+)
+load_dotenv()
+
+# Сколько секунд Telegram держит getUpdates открытым, если апдейтов нет
+LONG_POLL_TIMEOUT = int(os.getenv("TELEGRAM_LONG_POLL_TIMEOUT", "30"))
+# Пауза после сетевой ошибки перед следующим опросом
+ERROR_RETRY_DELAY = 5
+# Сколько ждём завершения начатых команд при остановке
+SHUTDOWN_GRACE = 30
+# Сколько последних update_id помним для отсева повторов
+RECENT_UPDATES = 1000
+# Как часто в режиме вебхука сохраняем offset и синхронизируем состояние
+STATE_SYNC_INTERVAL = 5
+# Проверять изменения расписания внутри демона (вместо cron в GitHub Actions)
+CHANGE_DETECTION = os.getenv("CHANGE_DETECTION", "1") == "1"
+
+# ─── Демон ────────────────────────────────────────────────────────────────────
+class BotDaemon:
+    """Постоянно работающий бот: long-polling getUpdates и параллельная обработка чатов"""
+
+    def __init__(self) -> None:
+        self.offset = load_offset()
+        self.associations = load_associations()
+        self.session = requests.Session()
+        self.stopping = asyncio.Event()
+        # Одна очередь на чат — ответы в пределах чата идут по порядку,
+        # а разные чаты обрабатываются параллельно
+        self.chat_queues: Dict[int, asyncio.Queue] = {}
+        self.chat_workers: Dict[int, asyncio.Task] = {}
+        self.dirty_files: set = set()
+        # Для идемпотентности: уже принятые update_id (вебхук может прислать апдейт повторно)
+        self.start_offset = self.offset
+        self.recent_ids: "OrderedDict[int, None]" = OrderedDict()
+        self.background: List[asyncio.Task] = []
+        # Скрейп-команды — в своём ограниченном пуле, чтобы не занимать потоки быстрых команд
+        self.commands = CommandPool()
+
+    def start_background(self) -> None:
+        """Фоновые задачи демона: проверка изменений расписания по расписанию"""
+        if CHANGE_DETECTION:
+            from functools import partial
+            from change_scheduler import AdaptiveScheduler, run_scheduled_check, upcoming_game_times
+            from venues import get_venues, get_venue_pool
+            venues = get_venues()
+            # Свой планировщик (и свой backoff) у каждой площадки; скрейпы — в общем ограниченном пуле
+            for venue in venues:
+                scheduler = AdaptiveScheduler(partial(run_scheduled_check, venue),
+                                              upcoming=partial(upcoming_game_times, cache=venue.cache()),
+                                              executor=get_venue_pool(),
+                                              name=venue.name if len(venues) > 1 else "")
+                self.background.append(asyncio.create_task(scheduler.run(self.stopping)))
+
+    # ─── Получение апдейтов ───────────────────────────────────────────────────
+    def _get_updates(self) -> List[Dict[str, Any]]:
+        res = self.session.get(
+            f"{API_URL}/bot{TOKEN}/getUpdates",
+            params={"offset": self.offset + 1, "timeout": LONG_POLL_TIMEOUT, "allowed_updates": '["message"]'},
+            timeout=LONG_POLL_TIMEOUT + 10,
+        )
+        try:
+            body = res.json()
+        except ValueError:
+            raise RuntimeError(f"Bot API вернул не JSON (HTTP {res.status_code})") from None
+        if not body.get("ok"):
+            # 409 — ещё стоит вебхук, 401 — неверный токен: ждём ERROR_RETRY_DELAY, а не опрашиваем в цикле
+            raise RuntimeError(f"Bot API: {body.get('error_code', res.status_code)} {body.get('description', '')}".rstrip())
+        return body.get("result", [])
+
+    async def poll_once(self) -> Optional[List[Dict[str, Any]]]:
+        """Один long-poll запрос. Возвращает None, если пришёл сигнал остановки"""
+        poll = asyncio.create_task(asyncio.to_thread(self._get_updates))
+        stop = asyncio.create_task(self.stopping.wait())
+        done, _ = await asyncio.wait({poll, stop}, return_when=asyncio.FIRST_COMPLETED)
+        if poll not in done:
+            # Незавершённый запрос бросаем: offset не сдвинут, апдейты придут снова
+            return None
+        stop.cancel()
+        return poll.result()
+
+    # ─── Обработка ────────────────────────────────────────────────────────────
+    def accept(self, update: Dict[str, Any]) -> bool:
+        """Принимает апдейт из любого источника; повторы отбрасываются"""
+        update_id = update.get("update_id")
+        if not isinstance(update_id, int) or update_id <= self.start_offset or update_id in self.recent_ids:
+            return False
+        self.recent_ids[update_id] = None
+        if len(self.recent_ids) > RECENT_UPDATES:
+            self.recent_ids.popitem(last=False)
+        self.offset = max(self.offset, update_id)
+        self.dispatch(update)
+        return True
+
+    def dispatch(self, update: Dict[str, Any]) -> None:
+        command = parse_command(update)
+        if not command:
+            return
+
+        chat_id, username, text = command
+        # Автоматически добавляем chat_id в рассылку
+        if add_chat_id(chat_id):
+            self.dirty_files.add(CHAT_IDS_FILE)
+
+        queue = self.chat_queues.get(chat_id)
+        if queue is None:
+            queue = self.chat_queues[chat_id] = asyncio.Queue()
+            self.chat_workers[chat_id] = asyncio.create_task(self.chat_worker(chat_id, queue))
+        queue.put_nowait((username, text))
+
+    async def chat_worker(self, chat_id: int, queue: asyncio.Queue) -> None:
+        while True:
+            username, text = await queue.get()
+            executor = self.commands.scrapes if is_scrape_command(text) else None
+            try:
+                if await asyncio.get_running_loop().run_in_executor(
+                        executor, handle_command, chat_id, username, text, self.associations):
+                    save_associations(dict(self.associations))
+                    self.dirty_files.add(ASSOCIATIONS_FILE)
+            except Exception as e:
+                print(f"⚠️ Ошибка обработки команды {text!r} от @{username}: {e}", file=sys.stderr)
+            finally:
+                queue.task_done()
+
+    # ─── Сохранение состояния ─────────────────────────────────────────────────
+    async def sync_state(self) -> None:
+        """Коммитит ассоциации и chat_id, только если они реально изменились"""
+        if not self.dirty_files:
+            return
+        files = sorted(self.dirty_files | {OFFSET_FILE})
+        self.dirty_files.clear()
+        # Экспортёр работает в своём потоке и копит изменения в один коммит
+        git_commit_files(files, "Update associations, chat_ids and offset")
+
+    async def run(self) -> None:
+        print(f"🤖 Бот запущен, long-polling с таймаутом {LONG_POLL_TIMEOUT} с")
+        self.start_background()
+        while not self.stopping.is_set():
+            try:
+                updates = await self.poll_once()
+            except Exception as e:
+                print(f"⚠️ Ошибка getUpdates: {e}", file=sys.stderr)
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), ERROR_RETRY_DELAY)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if not updates:
+                continue
+
+            for update in updates:
+                self.accept(update)
+            # Offset уходит в буфер хранилища (на диск — пачкой); следующий getUpdates
+            # с offset + 1 и так подтверждает принятые апдейты на стороне Telegram
+            save_offset(self.offset)
+            await self.sync_state()
+
+        await self.shutdown()
+
+    async def run_until_stopped(self) -> None:
+        """Режим без опроса (вебхук): апдейты приходят через accept()"""
+        self.start_background()
+        while not self.stopping.is_set():
+            try:
+                await asyncio.wait_for(self.stopping.wait(), STATE_SYNC_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            save_offset(self.offset)
+            await self.sync_state()
+        await self.shutdown()
+
+    async def shutdown(self) -> None:
+        print("🛑 Останавливаемся, дожидаемся начатых команд...")
+        pending = [q.join() for q in self.chat_queues.values()]
+        if pending:
+            try:
+                await asyncio.wait_for(asyncio.gather(*pending), SHUTDOWN_GRACE)
+            except asyncio.TimeoutError:
+                print("⚠️ Не все команды успели завершиться")
+        for task in self.chat_workers.values():
+            task.cancel()
+        await asyncio.to_thread(self.commands.close)
+        if self.background:
+            # Проверка, начатая в потоке, доработает до конца — ждём её, а не бросаем на середине
+            await asyncio.wait(self.background, timeout=SHUTDOWN_GRACE)
+        save_offset(self.offset)
+        if not get_state_store().durable:
+            self.dirty_files.add(OFFSET_FILE)
+        await self.sync_state()
+        await asyncio.to_thread(get_git_exporter().flush)
+        await asyncio.to_thread(get_state_store().flush)
+        self.session.close()
+        print("✅ Бот остановлен")
+
+    def stop(self) -> None:
+        self.stopping.set()
+
+
+def install_signal_handlers(daemon: BotDaemon) -> None:
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, daemon.stop)
+        except NotImplementedError:
+            # Windows: остаётся KeyboardInterrupt
+            pass
+
+async def run_daemon() -> None:
+    metrics.start_metrics_server()
+    daemon = BotDaemon()
+    install_signal_handlers(daemon)
+    await daemon.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_daemon())
@@ -0,0 +1,153 @@
+import os
+import sys
+import time
+import random
+import threading
+import metrics
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from dotenv import load_dotenv
+load_dotenv()
+
+TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
+# Адрес Bot API (переопределяется для бенчмарков с фейковым сервером)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+
+# Лимиты Telegram: ~30 сообщений в секунду всего и ~1 в секунду в один чат
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_PER_CHAT_RATE = float(os.getenv("TELEGRAM_PER_CHAT_RATE", "1"))
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "8"))
+SEND_MAX_ATTEMPTS = 5
+SEND_TIMEOUT = 10
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+
+# ─── Ограничение скорости ─────────────────────────────────────────────────────
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """После 429 с retry_after: никто не берёт токены, пока не пройдёт пауза"""
+        with self.lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+# ─── Рассылка ─────────────────────────────────────────────────────────────────
+class DeliveryResult(NamedTuple):
+    chat_id: int
+    ok: bool
+    status: Optional[int]
+    attempts: int
+    error: str = ""
+    message_id: Optional[int] = None
+
+    @property
+    def blocked(self) -> bool:
+        # 403: бот заблокирован или удалён из чата — слать туда больше нечего
+        return self.status == 403
+
+class Broadcaster:
+    """Отправка сообщений через общий пул соединений с учётом лимитов Telegram"""
+
+    def __init__(self, token: Optional[str] = TELEGRAM_TOKEN, concurrency: int = BROADCAST_CONCURRENCY,
+                 api_url: str = TELEGRAM_API_URL) -> None:
+        self.token = token
+        self.api_url = api_url
+        self.concurrency = concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.global_bucket = TokenBucket(TELEGRAM_GLOBAL_RATE)
+        self.chat_buckets: Dict[int, TokenBucket] = {}
+        self.buckets_lock = threading.Lock()
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        with self.buckets_lock:
+            bucket = self.chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = self.chat_buckets[chat_id] = TokenBucket(TELEGRAM_PER_CHAT_RATE, capacity=1)
+            return bucket
+
+    def call(self, method: str, chat_id: int, data: Dict) -> DeliveryResult:
+        """Вызов метода Bot API для одного чата с повторами на 429/5xx"""
+        with metrics.timer("telegram_send"):
+            result = self._call(method, chat_id, data)
+        metrics.inc("quezzle_telegram_requests_total", method=method, result="ok" if result.ok else "failed")
+        return result
+
+    def _call(self, method: str, chat_id: int, data: Dict) -> DeliveryResult:
+        url = f"{self.api_url}/bot{self.token}/{method}"
+        chat_bucket = self._chat_bucket(chat_id)
+        status, error = None, ""
+        for attempt in range(1, SEND_MAX_ATTEMPTS + 1):
+            chat_bucket.acquire()
+            self.global_bucket.acquire()
+            try:
+                res = self.session.post(url, data={"chat_id": chat_id, **data}, timeout=SEND_TIMEOUT)
+                status = res.status_code
+                body = res.json() if res.content else {}
+            except (requests.RequestException, ValueError) as e:
+                status, body, error = None, {}, str(e)
+
+            if status == 200 and body.get("ok"):
+                result = body.get("result")
+                message_id = result.get("message_id") if isinstance(result, dict) else None
+                return DeliveryResult(chat_id, True, status, attempt, message_id=message_id)
+            if status is not None:
+                error = body.get("description", f"HTTP {status}")
+            if status == 429:
+                metrics.inc("quezzle_telegram_throttled_total")
+                retry_after = (body.get("parameters") or {}).get("retry_after", 1)
+                print(f"⏳ Telegram просит подождать {retry_after} с (chat_id={chat_id})")
+                chat_bucket.pause(retry_after)
+                self.global_bucket.pause(retry_after)
+                continue
+            if status is None or status >= 500:
+                time.sleep(min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)) * (1 + random.random()))
+                continue
+            # 400/403 и прочее не лечится повтором
+            break
+        return DeliveryResult(chat_id, False, status, attempt, error)
+
+    def send(self, chat_id: int, text: str, **params) -> DeliveryResult:
+        return self.call("sendMessage", chat_id, {"text": text, **params})
+
+    def broadcast(self, chat_ids: List[int], text: str, **params) -> List[DeliveryResult]:
+        if not chat_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chat_ids))) as pool:
+            results = list(pool.map(lambda chat_id: self.send(chat_id, text, **params), chat_ids))
+        for result in results:
+            if not result.ok:
+                print(f"⚠️ Не доставлено chat_id={result.chat_id}: {result.status} {result.error}", file=sys.stderr)
+        return results
+
+
+_broadcaster: Optional[Broadcaster] = None
+_broadcaster_lock = threading.Lock()
+
+def get_broadcaster() -> Broadcaster:
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None:
+            _broadcaster = Broadcaster()
+        return _broadcaster
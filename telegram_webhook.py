@@ -0,0 +1,147 @@
+import os
+import sys
+import hmac
+import json
+import asyncio
+import requests
+import metrics
+from typing import Dict, Optional, Tuple
+from dotenv import load_dotenv
+from telegram_bot_daemon import BotDaemon, install_signal_handlers
+from telegram_commands_handler import API_URL, TOKEN
+load_dotenv()
+
+# Локальная проверка без Telegram:
+#   curl -H "X-Telegram-Bot-Api-Secret-Token: $TELEGRAM_WEBHOOK_SECRET" \
+#        --data @fixtures/updates/today.json http://127.0.0.1:8080/telegram/webhook
+
+WEBHOOK_HOST = os.getenv("TELEGRAM_WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook")
+# Обязателен: без него любой, кто достучится до порта, может подсунуть апдейты
+WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET")
+MAX_BODY_SIZE = 1024 * 1024
+READ_TIMEOUT = 10
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large"}
+
+# ─── HTTP ─────────────────────────────────────────────────────────────────────
+async def read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    method, path, _ = request_line.split(" ", 2)
+    headers: Dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0"))
+    if length > MAX_BODY_SIZE:
+        raise ValueError("payload too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+async def write_response(writer: asyncio.StreamWriter, status: int, body: bytes = b"",
+                         content_type: str = "text/plain; charset=utf-8") -> None:
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+# ─── Сервер ───────────────────────────────────────────────────────────────────
+class WebhookServer:
+    """Принимает POST от Telegram, сразу отвечает 200 и отдаёт апдейт демону"""
+
+    def __init__(self, daemon: BotDaemon, secret: Optional[str] = WEBHOOK_SECRET, path: str = WEBHOOK_PATH) -> None:
+        self.daemon = daemon
+        self.secret = secret
+        self.path = path
+        self.accepted = 0
+        self.duplicates = 0
+
+    def check_secret(self, headers: Dict[str, str]) -> bool:
+        if not self.secret:
+            return False
+        return hmac.compare_digest(headers.get("x-telegram-bot-api-secret-token", ""), self.secret)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, headers, body = await asyncio.wait_for(read_request(reader), READ_TIMEOUT)
+            except ValueError:
+                await write_response(writer, 413)
+                return
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                return
+
+            if path == "/healthz":
+                await write_response(writer, 200, b"ok")
+                return
+            if path != self.path:
+                await write_response(writer, 404)
+                return
+            if method != "POST":
+                await write_response(writer, 405)
+                return
+            if not self.check_secret(headers):
+                print("⚠️ Вебхук: неверный secret token", file=sys.stderr)
+                await write_response(writer, 401)
+                return
+            try:
+                update = json.loads(body)
+            except ValueError:
+                await write_response(writer, 400)
+                return
+
+            # Отвечаем сразу — обработка идёт в очереди чата, Telegram не ждёт
+            await write_response(writer, 200)
+            if self.daemon.accept(update):
+                self.accepted += 1
+            else:
+                self.duplicates += 1
+                print(f"Повтор апдейта {update.get('update_id')} пропущен")
+        except Exception as e:
+            print(f"⚠️ Ошибка вебхука: {e}", file=sys.stderr)
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT) -> None:
+        if not self.secret:
+            raise RuntimeError("TELEGRAM_WEBHOOK_SECRET не задан — вебхук без секрета не запускаем")
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"🌐 Вебхук слушает http://{host}:{port}{self.path}")
+        async with server:
+            await self.daemon.run_until_stopped()
+
+# ─── Регистрация в Telegram ───────────────────────────────────────────────────
+def set_webhook(url: str, secret: Optional[str] = WEBHOOK_SECRET) -> Dict:
+    if not secret:
+        raise ValueError("TELEGRAM_WEBHOOK_SECRET не задан — сервер вебхука без него не запустится")
+    data = {"url": url, "allowed_updates": json.dumps(["message"]), "secret_token": secret}
+    return requests.post(f"{API_URL}/bot{TOKEN}/setWebhook", data=data, timeout=10).json()
+
+def delete_webhook() -> Dict:
+    # Нужно, чтобы снова заработал getUpdates (иначе Telegram отвечает 409)
+    return requests.post(f"{API_URL}/bot{TOKEN}/deleteWebhook", timeout=10).json()
+
+async def run_webhook() -> None:
+    if not WEBHOOK_SECRET:
+        raise SystemExit("❗ Задайте TELEGRAM_WEBHOOK_SECRET (и передайте его в --set-webhook)")
+    # Метрики — на отдельном порту METRICS_HOST (по умолчанию только localhost), не на публичном вебхуке
+    metrics.start_metrics_server()
+    daemon = BotDaemon()
+    install_signal_handlers(daemon)
+    await WebhookServer(daemon).serve()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--set-webhook":
+        print(set_webhook(sys.argv[2]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "--delete-webhook":
+        print(delete_webhook())
+    else:
+        asyncio.run(run_webhook())
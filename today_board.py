@@ -0,0 +1,120 @@
+import os
+import sys
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import metrics
+from state_store import get_git_exporter
+
+# Режим «доски»: вместо новых сообщений об изменениях — одно закреплённое сообщение на чат
+TODAY_BOARD = os.getenv("TODAY_BOARD", "0") == "1"
+# Правки, пришедшие за это окно (секунды), сливаются в одну
+TODAY_BOARD_DEBOUNCE = float(os.getenv("TODAY_BOARD_DEBOUNCE", "30"))
+BOARD_META_KEY = "today_board"
+
+class TodayBoard:
+    """Закреплённое сообщение с расписанием на сегодня, которое правится на месте (своё у каждой площадки)"""
+
+    def __init__(self, venue, debounce: float = TODAY_BOARD_DEBOUNCE) -> None:
+        self.venue = venue
+        self.debounce = debounce
+        self.lock = threading.Lock()
+        self.publish_lock = threading.Lock()
+        self.pending: Optional[Tuple[str, str]] = None
+        self.timer: Optional[threading.Timer] = None
+
+    def update(self, target_date: str, text: str) -> None:
+        """Запоминает новый текст доски; отправка — по истечении окна, последней версией"""
+        with self.lock:
+            self.pending = (target_date, text)
+            if self.timer is None:
+                self.timer = threading.Timer(self.debounce, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self) -> None:
+        with self.lock:
+            pending, self.pending = self.pending, None
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if pending is None:
+            return
+        try:
+            self.publish(*pending)
+        except Exception as e:
+            print(f"⚠️ Не удалось обновить доску: {e}", file=sys.stderr)
+
+    def publish(self, target_date: str, text: str) -> None:
+        from telegram_broadcast import get_broadcaster
+        venue = self.venue
+        text = venue.label(text)
+        with self.publish_lock:
+            store = venue.store()
+            board = store.load_meta(BOARD_META_KEY) or {}
+            # Новый день — новые сообщения, вчерашние остаются в истории чата
+            messages: Dict[str, int] = dict(board.get("messages") or {}) if board.get("date") == target_date else {}
+            chat_ids = venue.chat_ids()
+            if not chat_ids:
+                print("⚠️ Нет chat_id для доски.")
+                return
+
+            broadcaster = get_broadcaster()
+
+            def publish_chat(chat_id: int) -> Tuple[int, Optional[int], bool]:
+                message_id = messages.get(str(chat_id))
+                if message_id:
+                    result = broadcaster.call("editMessageText", chat_id, {"message_id": message_id, "text": text})
+                    if result.ok or "message is not modified" in result.error:
+                        metrics.inc("quezzle_board_updates_total", action="edit")
+                        return chat_id, message_id, False
+                    if result.blocked:
+                        return chat_id, None, True
+                    # Сообщение удалили или оно слишком старое — публикуем заново
+                result = broadcaster.send(chat_id, text)
+                if not result.ok:
+                    return chat_id, None, result.blocked
+                broadcaster.call("pinChatMessage", chat_id,
+                                 {"message_id": result.message_id, "disable_notification": True})
+                metrics.inc("quezzle_board_updates_total", action="post")
+                return chat_id, result.message_id, False
+
+            with ThreadPoolExecutor(max_workers=min(broadcaster.concurrency, len(chat_ids))) as pool:
+                results = list(pool.map(publish_chat, chat_ids))
+
+            blocked: List[int] = []
+            for chat_id, message_id, is_blocked in results:
+                if is_blocked:
+                    blocked.append(chat_id)
+                if message_id:
+                    messages[str(chat_id)] = message_id
+                else:
+                    messages.pop(str(chat_id), None)
+            if blocked:
+                print(f"🗑️ Удаляем из рассылки chat_id: {sorted(blocked)}")
+                store.save_chat_ids([c for c in store.load_chat_ids() if c not in blocked])
+
+            store.save_meta(BOARD_META_KEY, {"date": target_date, "messages": messages})
+            print(f"📌 Доска {venue.name} на {target_date} обновлена в {len(messages)} из {len(chat_ids)} чатов")
+        get_git_exporter().request(f"Update today board {target_date}")
+
+
+_boards: Dict[str, TodayBoard] = {}
+_board_lock = threading.Lock()
+
+def _flush_at_exit() -> None:
+    # Разовый запуск (cron) не ждёт окно: отправляем сразу и выгружаем message_id в git
+    for board in list(_boards.values()):
+        board.flush()
+    get_git_exporter().flush()
+
+def get_today_board(venue=None) -> TodayBoard:
+    from quezzle_schedule import resolve_venue
+    venue = resolve_venue(venue)
+    with _board_lock:
+        if venue.id not in _boards:
+            if not _boards:
+                atexit.register(_flush_at_exit)
+            _boards[venue.id] = TodayBoard(venue)
+        return _boards[venue.id]
@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import threading
+import metrics
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+from quezzle_schedule import BRAIN_QUEZZLE_LINK, BRAIN_QUEZZLE_USERNAME, BRAIN_QUEZZLE_PASSWORD
+
+# JSON со списком площадок (см. venues.example.json); без него — одна площадка из BRAIN_QUEZZLE_*
+QUEZZLE_VENUES_FILE = os.getenv("QUEZZLE_VENUES_FILE", "")
+# Сколько площадок скрейпится одновременно (общий пул для всех проверок)
+VENUE_CONCURRENCY = int(os.getenv("VENUE_CONCURRENCY", "4"))
+# Площадка из переменных окружения — её состояние лежит там же, где и раньше
+DEFAULT_VENUE_ID = "default"
+# Явный адрес формы входа, если сайт не отдаёт её в HTML (для площадки из окружения)
+BRAIN_QUEZZLE_LOGIN_URL = os.getenv("BRAIN_QUEZZLE_LOGIN_URL")
+
+class Venue:
+    """Площадка бронирований: свой вход, свои чаты и своё пространство состояния.
+    Источник, кэш снимка и архив создаются лениво, по одному на площадку"""
+
+    def __init__(self, venue_id: str, link: str, username: str, password: str, name: str = "",
+                 login_url: Optional[str] = None, chats: Optional[List[int]] = None) -> None:
+        self.id = venue_id
+        self.name = name or venue_id
+        self.link = link
+        self.username = username
+        self.password = password
+        self.login_url = login_url
+        # None — рассылка во все чаты бота
+        self.chats = chats
+        # Подписывать сообщения названием площадки, когда площадок несколько
+        self.tagged = False
+        # Источник при создании берёт хранилище cookie той же площадки
+        self.lock = threading.RLock()
+        self._fetcher = None
+        self._cache = None
+        self._archive = None
+        self._sessions = None
+
+    @property
+    def is_default(self) -> bool:
+        return self.id == DEFAULT_VENUE_ID
+
+    def store(self):
+        from state_store import get_state_store
+        store = get_state_store()
+        return store if self.is_default else store.for_venue(self.id)
+
+    def chat_ids(self) -> List[int]:
+        if self.chats is not None:
+            return list(self.chats)
+        from state_store import get_state_store
+        return get_state_store().load_chat_ids()
+
+    def label(self, text: str) -> str:
+        return f"📍 {self.name}\n{text}" if self.tagged and text else text
+
+    def fetcher(self):
+        with self.lock:
+            if self._fetcher is None:
+                from quezzle_fetchers import make_fetcher
+                self._fetcher = make_fetcher(self)
+            return self._fetcher
+
+    def cache(self):
+        with self.lock:
+            if self._cache is None:
+                from schedule_cache import ScheduleCache
+                from schedule_snapshot import fetch_snapshot
+                self._cache = ScheduleCache(lambda known_digest: fetch_snapshot(self.fetcher(), known_digest))
+            return self._cache
+
+    def archive(self):
+        with self.lock:
+            if self._archive is None:
+                from state_store import ARCHIVE_DIR
+                from schedule_archive import ScheduleArchive
+                self._archive = ScheduleArchive(ARCHIVE_DIR if self.is_default else os.path.join(ARCHIVE_DIR, self.id))
+            return self._archive
+
+    def session_store(self):
+        with self.lock:
+            if self._sessions is None:
+                from session_store import SESSION_FILE, SessionStore
+                # У каждой учётной записи свои cookie
+                self._sessions = SessionStore(SESSION_FILE if self.is_default else f"{SESSION_FILE}.{self.id}")
+            return self._sessions
+
+# ─── Конфигурация ─────────────────────────────────────────────────────────────
+def venue_from_dict(data: Dict) -> Venue:
+    """Пароль (и логин) лучше держать в окружении: password_env — имя переменной"""
+    venue_id = str(data.get("id") or "").strip()
+    if not venue_id or venue_id == DEFAULT_VENUE_ID or "/" in venue_id:
+        raise ValueError(f"площадке нужен уникальный id (не {DEFAULT_VENUE_ID!r}): {data}")
+    username = os.getenv(data["username_env"]) if data.get("username_env") else data.get("username")
+    password = os.getenv(data["password_env"]) if data.get("password_env") else data.get("password")
+    if not data.get("link") or not username or not password:
+        raise ValueError(f"у площадки {venue_id} не заданы link, логин или пароль")
+    chats = data.get("chats")
+    return Venue(venue_id, data["link"], username, password, name=data.get("name", ""),
+                 login_url=data.get("login_url"), chats=[int(c) for c in chats] if chats is not None else None)
+
+def load_venues(path: str = QUEZZLE_VENUES_FILE) -> List[Venue]:
+    if not path:
+        return [Venue(DEFAULT_VENUE_ID, BRAIN_QUEZZLE_LINK, BRAIN_QUEZZLE_USERNAME, BRAIN_QUEZZLE_PASSWORD,
+                      login_url=BRAIN_QUEZZLE_LOGIN_URL)]
+    with open(path, "r", encoding="utf-8") as f:
+        venues = [venue_from_dict(item) for item in json.load(f)]
+    if not venues:
+        raise ValueError(f"в {path} нет ни одной площадки")
+    if len({v.id for v in venues}) != len(venues):
+        raise ValueError(f"в {path} повторяются id площадок")
+    for venue in venues:
+        venue.tagged = len(venues) > 1
+    print(f"🏟️ Площадки: {', '.join(v.name for v in venues)}")
+    return venues
+
+# ─── Параллельная проверка ────────────────────────────────────────────────────
+def run_all(check: Callable[[Venue], Any], venues: Optional[List[Venue]] = None) -> Dict[str, Any]:
+    """check(venue) по всем площадкам в общем пуле. Каждая площадка сама рассылает свои
+    изменения, так что медленная не задерживает остальные; её ошибка — в результате, а не исключение"""
+    venues = venues if venues is not None else get_venues()
+    if len(venues) == 1:
+        # Одна площадка — как раньше: без пула, ошибки уходят вызывающему
+        return {venues[0].id: check(venues[0])}
+    pool = get_venue_pool()
+    futures = {pool.submit(check, venue): venue for venue in venues}
+    results: Dict[str, Any] = {}
+    for future in as_completed(futures):
+        venue = futures[future]
+        try:
+            results[venue.id] = future.result()
+        except Exception as e:
+            metrics.inc("quezzle_venue_failures_total", venue=venue.id)
+            print(f"⚠️ Площадка {venue.name}: проверка не удалась: {e}", file=sys.stderr)
+            results[venue.id] = e
+    return results
+
+
+_venues: Optional[List[Venue]] = None
+_pool: Optional[ThreadPoolExecutor] = None
+_venues_lock = threading.Lock()
+
+def get_venues() -> List[Venue]:
+    global _venues
+    with _venues_lock:
+        if _venues is None:
+            _venues = load_venues()
+        return _venues
+
+def primary_venue() -> Venue:
+    """Площадка по умолчанию для кода без контекста чата — первая в списке"""
+    return get_venues()[0]
+
+def venue_for_chat(chat_id: int, venue_id: Optional[str] = None) -> Venue:
+    """Площадка для команды из чата (/today, /stats …): названная в команде, иначе та, в чьих
+    chats есть этот чат, иначе единственная площадка «для всех чатов». Выбрать нельзя — ValueError
+    с текстом для пользователя"""
+    venues = get_venues()
+    if venue_id:
+        for venue in venues:
+            if venue.id == venue_id:
+                return venue
+        raise ValueError(f"Unknown venue {venue_id}. Venues: {', '.join(v.id for v in venues)}")
+    if len(venues) == 1:
+        return venues[0]
+    listed = [v for v in venues if v.chats is not None and chat_id in v.chats]
+    candidates = listed or [v for v in venues if v.chats is None]
+    if len(candidates) == 1:
+        return candidates[0]
+    if not candidates:
+        raise ValueError(f"This chat is not linked to any venue. Add the venue id to the command: "
+                         f"{', '.join(v.id for v in venues)}")
+    raise ValueError(f"This chat belongs to several venues. Add the venue id to the command: "
+                     f"{', '.join(v.id for v in candidates)}")
+
+def get_venue_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _venues_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=VENUE_CONCURRENCY, thread_name_prefix="venue")
+        return _pool